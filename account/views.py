@@ -11,6 +11,8 @@ from .serializer import *
 from .tasks import email_verification, reset_password
 from datetime import timedelta, datetime
 from .permissions import IsNotBanned
+from app.cache import user_tag, TAGGED_TIMEOUT
+from app.conditional import cache_payload, conditional_response
 
 
 class RegisterView(APIView):
@@ -128,18 +130,18 @@ class UserInfoView(APIView):
 
     def get(self, request, username):
         cache_key = f"user_{username}"
-        data = cache.get(cache_key)
+        entry = cache.get(cache_key)
+
+        if entry:
+            return conditional_response(request, entry)
 
         user = get_object_or_404(get_user_model(), username=username)
 
         serializer = UserInfoSerializer(user).data
 
-        if data:
-            return Response(data, status=status.HTTP_200_OK)
-
-        cache.set(cache_key, serializer, 600)
+        entry = cache_payload(cache_key, serializer, TAGGED_TIMEOUT, [user_tag(user.id)])
 
-        return Response(serializer, status=status.HTTP_200_OK)
+        return conditional_response(request, entry)
 
 
 class LogoutView(APIView):
@@ -168,7 +170,6 @@ class EditProfileView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        cache.delete(f"user_{user.username}")
         serializer.save()
         return Response(
             {
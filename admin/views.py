@@ -16,7 +16,7 @@ class NotApprovedHousingListView(APIView):
     permission_classes = [IsAuthenticated, IsAdminUser]
 
     def get(self, request):
-        housings = Housing.objects.all().filter(approved=False).select_related("owner", "type")
+        housings = Housing.objects.all().filter(status=False).order_by("-created_at").select_related("owner", "type")
         serializer = HousingSerializer(housings, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -0,0 +1,271 @@
+import hashlib
+import json
+import time
+from datetime import timedelta
+
+import redis
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.http import urlencode
+
+CATALOG_GENERATION_KEY = "catalog_generation"
+AVAILABILITY_GENERATION_KEY = "availability_generation"
+HOUSING_LIST_TIMEOUT = 60 * 60
+# Tagged payloads are dropped by invalidate_tags on every write, so the TTL is only a memory bound.
+TAGGED_TIMEOUT = 60 * 60 * 6
+FAVORITE_IDS_TIMEOUT = TAGGED_TIMEOUT
+HOUSING_DETAIL_TIMEOUT = TAGGED_TIMEOUT
+# Payloads with date_status (computed against today) still have to be rebuilt regularly.
+BOOKINGS_TIMEOUT = 60 * 10
+TAG_TIMEOUT = TAGGED_TIMEOUT + 60 * 60
+CATALOG_TAG = "catalog"
+AVAILABILITY_PARAMS = ("check_in", "check_out")
+HOUSING_FACETS_DIRTY_KEY = "housing_facets_dirty"
+
+# Deletes every key registered under the tag sets in KEYS, then the sets themselves. ARGV[1] is the catalog
+# generation key to bump ("" to leave it), ARGV[2] the clock seed used when that key is missing.
+INVALIDATE_TAGS_SCRIPT = """
+local deleted = 0
+for _, tag in ipairs(KEYS) do
+    local members = redis.call("SMEMBERS", tag)
+    for i = 1, #members, 5000 do
+        deleted = deleted + redis.call("DEL", unpack(members, i, math.min(i + 4999, #members)))
+    end
+    redis.call("DEL", tag)
+end
+if ARGV[1] ~= "" then
+    if redis.call("EXISTS", ARGV[1]) == 1 then
+        redis.call("INCR", ARGV[1])
+    else
+        redis.call("SET", ARGV[1], ARGV[2])
+    end
+end
+return deleted
+"""
+
+# Adds ARGV[3..] to the tag set KEYS[1] and renews its TTL (ARGV[1]), so the set outlives every entry it lists.
+# Entries that expire or are overwritten stay listed until the tag is invalidated, so each registration also
+# checks ARGV[2] random members and drops those whose key is gone: hot tags stay near their live size.
+REGISTER_TAG_SCRIPT = """
+redis.call("SADD", KEYS[1], unpack(ARGV, 3))
+redis.call("EXPIRE", KEYS[1], ARGV[1])
+for _, member in ipairs(redis.call("SRANDMEMBER", KEYS[1], tonumber(ARGV[2]))) do
+    if redis.call("EXISTS", member) == 0 then
+        redis.call("SREM", KEYS[1], member)
+    end
+end
+"""
+TAG_PRUNE_SAMPLE = 20
+
+_redis_client = None
+_invalidate_tags_script = None
+_register_tag_script = None
+
+
+def get_redis():
+    """Raw client for the structures the cache API doesn't cover (sets, bitmaps, pipelines)."""
+    global _redis_client
+
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.CACHES["default"]["LOCATION"])
+
+    return _redis_client
+
+
+def until_midnight(timeout) -> int:
+    """`timeout`, cut short at midnight for payloads that compare dates against today."""
+    now = timezone.localtime()
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    return min(timeout, int((midnight - now).total_seconds()) + 1)
+
+
+def get_generation(key: str) -> int:
+    generation = cache.get(key)
+
+    if generation is None:
+        # Seeding from the clock keeps a restarted counter from reusing an old generation.
+        cache.add(key, time.time_ns() // 1000, timeout=None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def bump_generation(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        get_generation(key)
+
+
+def get_catalog_generation() -> int:
+    return get_generation(CATALOG_GENERATION_KEY)
+
+
+def bump_catalog_generation() -> None:
+    bump_generation(CATALOG_GENERATION_KEY)
+
+
+def bump_availability_generation() -> None:
+    bump_generation(AVAILABILITY_GENERATION_KEY)
+
+
+def canonical_value(key, value):
+    # ?fields=name,id and ?fields=id,name select the same payload.
+    if key in ("fields", "omit"):
+        return ",".join(sorted(name.strip() for name in value.split(",") if name.strip()))
+
+    return value
+
+
+def query_digest(query_params, keys=None) -> str:
+    """Digest of the (non-empty) query params, or only of `keys`, independent of their order in the URL."""
+    normalized = urlencode(sorted(
+        (key, canonical_value(key, value))
+        for key in query_params
+        if keys is None or key in keys
+        for value in sorted(query_params.getlist(key))
+        if value != ""
+    ))
+
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def housing_list_cache_key(query_params) -> str:
+    digest = query_digest(query_params)
+    generation = get_catalog_generation()
+
+    # Only date-filtered pages depend on bookings, so only they follow the availability counter.
+    if any(query_params.get(param) for param in AVAILABILITY_PARAMS):
+        generation = f"{generation}_{get_generation(AVAILABILITY_GENERATION_KEY)}"
+
+    return f"housing_list_{generation}_{digest}"
+
+
+def review_page_cache_key(housing_id, cursor, page_size) -> str:
+    return f"review_{housing_id}_{page_size}_{cursor or 'first'}"
+
+
+def reservations_page_cache_key(username, filters_digest, cursor, page_size) -> str:
+    return f"my_housing_reservations_{username}_{filters_digest}_{page_size}_{cursor or 'first'}"
+
+
+def favorite_ids_cache_key(user) -> str:
+    return f"favorite_ids_{user.username}"
+
+
+def get_favorite_housing_ids(user) -> set:
+    """Ids of the user's favorite listings, loaded with one indexed query and kept in the cache."""
+    from .models import Favorites
+
+    cache_key = favorite_ids_cache_key(user)
+    favorite_ids = cache.get(cache_key)
+
+    if favorite_ids is None:
+        favorite_ids = set(
+            Favorites.objects.filter(favorites_owner=user).values_list("favorites_housing_id", flat=True)
+        )
+        set_tagged(cache_key, favorite_ids, FAVORITE_IDS_TIMEOUT, [user_tag(user.id)])
+
+    return favorite_ids
+
+
+def is_listing_host(user) -> bool:
+    """Whether the user has approved listings, which listing pages must leave out for them."""
+    from .models import Housing
+
+    cache_key = f"listing_host_{user.username}"
+    is_host = cache.get(cache_key)
+
+    if is_host is None:
+        is_host = Housing.objects.filter(owner=user, status=True).exists()
+        # Housing writes invalidate their owner's tag, so a listing going live or offline drops this.
+        set_tagged(cache_key, is_host, TAGGED_TIMEOUT, [user_tag(user.id)])
+
+    return is_host
+
+
+def mark_housing_facets_dirty(*housing_values) -> None:
+    """Queue the facet values of changed listings for the incremental facet refresh."""
+    entries = set()
+    for values in housing_values:
+        for dimension, field in (("type", "type_id"), ("city", "city"), ("country", "country"), ("price", "price")):
+            if values.get(field) is not None:
+                entries.add(json.dumps([dimension, values[field]]))
+
+    if entries:
+        get_redis().sadd(HOUSING_FACETS_DIRTY_KEY, *entries)
+
+
+def mark_type_facets_dirty(*names) -> None:
+    """Queue type slices by name, for types whose id no longer resolves to the name their facet rows carry."""
+    if names:
+        get_redis().sadd(HOUSING_FACETS_DIRTY_KEY, *(json.dumps(["type_name", name]) for name in names))
+
+
+def housing_tag(housing_id) -> str:
+    return f"housing:{housing_id}"
+
+
+def user_tag(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def reservations_tag(host_id) -> str:
+    # Only the host's reservation pages, for writers that know exactly what they changed.
+    return f"reservations:{host_id}"
+
+
+def tag_set_key(tag) -> str:
+    return f"cache_tag:{tag}"
+
+
+def tag_cache_keys(tags_by_key) -> None:
+    """Register cached entries under their tags, so invalidate_tags can find them."""
+    global _register_tag_script
+
+    members = {}
+    for cache_key, tags in tags_by_key.items():
+        for tag in tags:
+            members.setdefault(tag_set_key(tag), set()).add(cache.make_key(cache_key))
+
+    if not members:
+        return
+
+    if _register_tag_script is None:
+        _register_tag_script = get_redis().register_script(REGISTER_TAG_SCRIPT)
+
+    pipeline = get_redis().pipeline(transaction=False)
+    for tag_key, made_keys in members.items():
+        made_keys = sorted(made_keys)
+        # Chunked to stay within Lua's unpack() limit.
+        for start in range(0, len(made_keys), 1000):
+            chunk = made_keys[start:start + 1000]
+            _register_tag_script(keys=[tag_key], args=[TAG_TIMEOUT, TAG_PRUNE_SAMPLE, *chunk], client=pipeline)
+    pipeline.execute()
+
+
+def set_tagged(cache_key, value, timeout, tags) -> None:
+    cache.set(cache_key, value, timeout)
+    tag_cache_keys({cache_key: tags})
+
+
+def set_many_tagged(values, timeout, tags_by_key) -> None:
+    cache.set_many(values, timeout)
+    tag_cache_keys(tags_by_key)
+
+
+def invalidate_tags(*tags) -> int:
+    """Drop every entry registered under any of the tags in one round-trip; `catalog` also bumps the catalog generation."""
+    global _invalidate_tags_script
+
+    if _invalidate_tags_script is None:
+        _invalidate_tags_script = get_redis().register_script(INVALIDATE_TAGS_SCRIPT)
+
+    tags = set(tags)
+    generation_key = cache.make_key(CATALOG_GENERATION_KEY) if CATALOG_TAG in tags else ""
+
+    return _invalidate_tags_script(
+        keys=[tag_set_key(tag) for tag in tags], args=[generation_key, time.time_ns() // 1000],
+    )
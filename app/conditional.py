@@ -0,0 +1,134 @@
+import hashlib
+import math
+import random
+import time
+
+from django.core.cache import cache
+from django.utils.cache import parse_etags, patch_vary_headers
+from redis.exceptions import LockError
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import get_redis, set_tagged, set_many_tagged
+from .renderers import FastJSONRenderer
+
+REBUILD_LOCK_TIMEOUT = 5
+REBUILD_POLL_INTERVAL = 0.05
+
+
+def payload_digest(data) -> str:
+    return hashlib.blake2b(FastJSONRenderer().render(data), digest_size=16).hexdigest()
+
+
+def selection_variant(selection) -> str:
+    """Short, order-independent tag for a `?fields=`/`?omit=` selection."""
+    if not selection:
+        return ""
+
+    canonical = ";".join(f"{param}={','.join(sorted(names))}" for param, names in sorted(selection.items()))
+    return hashlib.blake2b(canonical.encode(), digest_size=4).hexdigest()
+
+
+def make_entry(data, timeout, delta=0.0) -> dict:
+    # expires/delta (seconds the rebuild took) drive the probabilistic early refresh in read_through.
+    return {"etag": payload_digest(data), "data": data, "expires": time.time() + timeout, "delta": delta}
+
+
+def cache_payload(cache_key, data, timeout, tags=(), delta=0.0) -> dict:
+    """Cache a payload together with its digest, so conditional requests never have to re-serialize it."""
+    entry = make_entry(data, timeout, delta)
+    set_tagged(cache_key, entry, timeout, tags)
+
+    return entry
+
+
+def cache_payloads(payloads, timeout) -> dict:
+    """cache_payload for many keys at once: `payloads` maps cache keys to (data, tags)."""
+    entries = {cache_key: make_entry(data, timeout) for cache_key, (data, _) in payloads.items()}
+    set_many_tagged(entries, timeout, {cache_key: tags for cache_key, (_, tags) in payloads.items()})
+
+    return entries
+
+
+def should_refresh_early(entry, beta=1.0) -> bool:
+    """XFetch: the closer to expiry and the slower the rebuild, the likelier a request refreshes ahead of time."""
+    if not entry.get("delta"):
+        return False
+
+    return time.time() - entry["delta"] * beta * math.log(1.0 - random.random()) >= entry["expires"]
+
+
+def read_through(cache_key, build, timeout) -> dict:
+    """
+    Cached entry for `cache_key`, rebuilt by exactly one caller when missing or due for early refresh.
+    `build` returns the payload and the tags to register it under.
+
+    The rebuilder holds a short Redis lock; while it works, others keep serving the current entry or,
+    on a cold key, wait for it to appear instead of running the same queries.
+    """
+    entry = cache.get(cache_key)
+    if entry is not None and not should_refresh_early(entry):
+        return entry
+
+    lock = get_redis().lock(f"rebuild_lock:{cache_key}", timeout=REBUILD_LOCK_TIMEOUT)
+    if lock.acquire(blocking=False):
+        try:
+            return rebuild(cache_key, build, timeout)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass
+
+    if entry is not None:
+        return entry
+
+    deadline = time.monotonic() + REBUILD_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(REBUILD_POLL_INTERVAL)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return entry
+        if not lock.locked():
+            break
+
+    # The rebuilder failed (e.g. 404) or is stuck; don't keep the request waiting on it.
+    return rebuild(cache_key, build, timeout)
+
+
+def rebuild(cache_key, build, timeout) -> dict:
+    started = time.monotonic()
+    data, tags = build()
+
+    return cache_payload(cache_key, data, timeout, tags, delta=time.monotonic() - started)
+
+
+def make_etag(request, digest, variant="") -> str:
+    # Each representation gets its own strong tag: msgpack and JSON bodies, or trimmed fieldsets, differ byte-wise.
+    tag = f"{digest}-{variant}" if variant else digest
+    if request.accepted_renderer.format != "json":
+        tag = f"{tag}-{request.accepted_renderer.format}"
+
+    return f'"{tag}"'
+
+
+def is_not_modified(request, etag) -> bool:
+    etags = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+
+    # If-None-Match uses the weak comparison, so the W/ prefix added when a body is compressed still matches.
+    return "*" in etags or any(candidate.removeprefix("W/") == etag for candidate in etags)
+
+
+def conditional_response(request, entry, data=None, variant="") -> Response:
+    """200 with an ETag, or an empty 304 when the client already has this representation."""
+    etag = make_etag(request, entry["etag"], variant)
+
+    if is_not_modified(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(entry["data"] if data is None else data, status=status.HTTP_200_OK)
+
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Accept",))
+
+    return response
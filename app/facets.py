@@ -0,0 +1,144 @@
+import json
+from itertools import combinations
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+
+from .models import Housing, HousingFacet, TypeOfHousing
+
+PRICE_BUCKETS = ((0, 50), (50, 100), (100, 200), (200, 500), (500, None))
+DIMENSIONS = ("type", "city", "country", "price")
+# HousingFilter params that select exactly one facet value; a request with only one of them is a stored slice.
+SLICE_FILTERS = ("type", "country")
+# Listing params that don't narrow the result set.
+NON_FILTER_PARAMS = ("page", "page_size", "pagination", "cursor", "with_total", "ordering", "fields", "omit")
+
+
+def bucket_name(low, high):
+    return f"{low}+" if high is None else f"{low}-{high}"
+
+
+def price_bucket(price):
+    for low, high in PRICE_BUCKETS:
+        if high is None or price < high:
+            return bucket_name(low, high)
+
+
+def with_facet_columns(queryset):
+    buckets = [When(price__lt=high, then=Value(bucket_name(low, high))) for low, high in PRICE_BUCKETS if high]
+
+    return queryset.order_by().annotate(
+        facet_type=F("type__name"),
+        facet_city=F("city"),
+        facet_country=F("country"),
+        facet_price=Case(*buckets, default=Value(bucket_name(*PRICE_BUCKETS[-1])), output_field=CharField()),
+    )
+
+
+def approved_housings():
+    return with_facet_columns(Housing.objects.filter(status=True))
+
+
+def count_facets(queryset) -> dict:
+    """Live GROUP BY per dimension, for filter combinations the facet table doesn't cover."""
+    queryset = with_facet_columns(queryset)
+
+    return {
+        dimension: [
+            {"value": row["value"], "count": row["count"]}
+            for row in queryset.values(value=F(f"facet_{dimension}")).annotate(count=Count("id")).order_by("-count", "value")
+        ]
+        for dimension in DIMENSIONS
+    }
+
+
+def read_facets(params) -> dict | None:
+    """Facets from the precomputed table, or None when the request isn't unfiltered or a single-value slice."""
+    if not params:
+        rows = HousingFacet.objects.filter(filter_dimension="")
+    elif len(params) == 1 and next(iter(params)) in SLICE_FILTERS:
+        dimension, value = next(iter(params.items()))
+        # The filtered dimension itself keeps its overall counts, so the sidebar can still offer the other values.
+        rows = HousingFacet.objects.filter(
+            Q(filter_dimension="", dimension=dimension) | Q(filter_dimension=dimension, filter_value=value)
+        )
+    else:
+        return None
+
+    rows = list(rows.order_by("-count", "value").values_list("dimension", "value", "count"))
+    if not rows:
+        return None
+
+    facets = {dimension: [] for dimension in DIMENSIONS}
+    for dimension, value, count in rows:
+        facets[dimension].append({"value": value, "count": count})
+
+    return facets
+
+
+def pair_rows(first, first_value, second, second_value, count):
+    return [
+        HousingFacet(filter_dimension=first, filter_value=first_value, dimension=second, value=second_value, count=count),
+        HousingFacet(filter_dimension=second, filter_value=second_value, dimension=first, value=first_value, count=count),
+    ]
+
+
+def rebuild_housing_facets() -> None:
+    approved = approved_housings()
+    rows = []
+
+    for dimension in DIMENSIONS:
+        for row in approved.values(value=F(f"facet_{dimension}")).annotate(count=Count("id")):
+            rows.append(HousingFacet(dimension=dimension, value=row["value"], count=row["count"]))
+
+    for first, second in combinations(DIMENSIONS, 2):
+        pairs = approved.values(first_value=F(f"facet_{first}"), second_value=F(f"facet_{second}"))
+        for row in pairs.annotate(count=Count("id")):
+            rows.extend(pair_rows(first, row["first_value"], second, row["second_value"], row["count"]))
+
+    with transaction.atomic():
+        HousingFacet.objects.all().delete()
+        HousingFacet.objects.bulk_create(rows, batch_size=1000)
+
+
+def refresh_facet_slice(dimension, value) -> None:
+    """Recount every stored row that involves one facet value."""
+    scope = approved_housings().filter(**{f"facet_{dimension}": value})
+    rows = []
+
+    total = scope.count()
+    if total:
+        rows.append(HousingFacet(dimension=dimension, value=value, count=total))
+
+    for other in DIMENSIONS:
+        if other == dimension:
+            continue
+        for row in scope.values(other_value=F(f"facet_{other}")).annotate(count=Count("id")):
+            rows.extend(pair_rows(dimension, value, other, row["other_value"], row["count"]))
+
+    with transaction.atomic():
+        HousingFacet.objects.filter(
+            Q(filter_dimension=dimension, filter_value=value) | Q(dimension=dimension, value=value)
+        ).delete()
+        HousingFacet.objects.bulk_create(rows, batch_size=1000)
+
+
+def dirty_slices(entries) -> set:
+    """Turn queued (field, raw value) entries into (dimension, facet value) slices."""
+    slices = set()
+    type_ids = set()
+
+    for entry in entries:
+        dimension, value = json.loads(entry)
+        if dimension == "type":
+            type_ids.add(value)
+        elif dimension == "type_name":
+            slices.add(("type", value))
+        elif dimension == "price":
+            slices.add(("price", price_bucket(value)))
+        else:
+            slices.add((dimension, value))
+
+    slices.update(("type", name) for name in TypeOfHousing.objects.filter(id__in=type_ids).values_list("name", flat=True))
+
+    return slices
@@ -1,16 +1,163 @@
+import re
+
 import django_filters
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.backends.postgresql.psycopg_any import DateRange
+from django.db.models import Exists, F, OuterRef, Q
+from rest_framework.exceptions import ValidationError
+
+from app.geo import box_around, distance_km, split_box, within_boxes
+from app.models import Housing, Booking
+
+SEARCH_CONFIG = "english"
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 500
+
+
+def build_search_query(value):
+    """Prefix tsquery ("coz:* & vil:*") so keystroke-driven searches hit the GIN index."""
+    words = re.findall(r"\w+", value)
+    if not words:
+        return None
+
+    return SearchQuery(" & ".join(f"{word}:*" for word in words), search_type="raw", config=SEARCH_CONFIG)
+
+
+class CoordinatesFilter(django_filters.BaseCSVFilter, django_filters.CharFilter):
+    pass
+
 
-from app.models import Housing
+def parse_coordinates(values, count, param):
+    try:
+        coordinates = [float(value) for value in values]
+    except ValueError:
+        raise ValidationError({param: "Coordinates must be numbers."})
+
+    if len(coordinates) != count:
+        raise ValidationError({param: f"Expected {count} comma-separated numbers."})
+
+    return coordinates
+
+
+def validate_point(lat, lng):
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise ValidationError({"location": "Latitude must be within ±90 and longitude within ±180."})
 
 
 class HousingFilter(django_filters.FilterSet):
     price_min = django_filters.NumberFilter(field_name='price', lookup_expr='gte', label="Search price min")
     price_max = django_filters.NumberFilter(field_name='price', lookup_expr='lte', label="Search price max")
-    search = django_filters.CharFilter(field_name='name', lookup_expr='icontains', label="Search by name")
-    city = django_filters.CharFilter(field_name="city", lookup_expr="icontains", label="Search city")
+    rating_min = django_filters.NumberFilter(field_name='avg_rating', lookup_expr='gte', label="Minimum average rating")
+    search = django_filters.CharFilter(method="filter_search", label="Search by name, description, city or country")
+    city = django_filters.CharFilter(method="filter_city", label="Search city")
     type = django_filters.CharFilter(field_name="type__name", lookup_expr="exact", label="Search type")
     owner = django_filters.CharFilter(field_name="owner__username", lookup_expr="exact", label="Search owner")
+    check_in = django_filters.DateFilter(method="filter_dates", label="Free from (check-in date)")
+    check_out = django_filters.DateFilter(method="filter_dates", label="Free until (check-out date)")
+    bbox = CoordinatesFilter(method="filter_location", label="Bounding box: min_lng,min_lat,max_lng,max_lat")
+    near = CoordinatesFilter(method="filter_location", label="Search around a point: lat,lng")
+    radius = django_filters.NumberFilter(method="filter_location", label="Radius around `near` in km")
+    ordering = django_filters.ChoiceFilter(
+        method="filter_ordering", choices=(("relevance", "relevance"), ("rating", "rating")), label="Order results"
+    )
 
     class Meta:
         model = Housing
         fields = ['price_min', 'price_max', 'country', 'city', "search", "type"]
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        check_in = self.form.cleaned_data.get("check_in")
+        check_out = self.form.cleaned_data.get("check_out")
+        if bool(check_in) != bool(check_out):
+            raise ValidationError({"check_out" if check_in else "check_in": "Both check_in and check_out are required."})
+        if check_in and check_out <= check_in:
+            raise ValidationError({"check_out": "Check-out must be after check-in."})
+        if check_in:
+            # Anti-join probes the (housing, stay) GiST index once per listing, never the whole table.
+            taken = Booking.objects.filter(housing=OuterRef("pk"), stay__overlap=DateRange(check_in, check_out))
+            queryset = queryset.filter(~Exists(taken))
+
+        return self.filter_geo(queryset)
+
+    def filter_geo(self, queryset):
+        near = self.form.cleaned_data.get("near")
+        bbox = self.form.cleaned_data.get("bbox")
+        radius = self.form.cleaned_data.get("radius")
+
+        if radius is not None and not near:
+            raise ValidationError({"radius": "A radius needs a `near` point."})
+
+        if near:
+            lat, lng = parse_coordinates(near, 2, "near")
+            validate_point(lat, lng)
+            radius = float(DEFAULT_RADIUS_KM if radius is None else radius)
+            if not 0 < radius <= MAX_RADIUS_KM:
+                raise ValidationError({"radius": f"Radius must be between 0 and {MAX_RADIUS_KM} km."})
+
+            # The boxes are answered by the GiST index; the exact radius is then checked on those rows only.
+            return queryset.filter(within_boxes(box_around(lat, lng, radius))).annotate(
+                distance_km=distance_km(lat, lng)
+            ).filter(distance_km__lte=radius).order_by("distance_km", "id")
+
+        if bbox:
+            min_lng, min_lat, max_lng, max_lat = parse_coordinates(bbox, 4, "bbox")
+            validate_point(min_lat, min_lng)
+            validate_point(max_lat, max_lng)
+            if min_lat > max_lat:
+                raise ValidationError({"bbox": "min_lat must not be above max_lat."})
+
+            # min_lng > max_lng is a box across the antimeridian, so its centre is on the far side too.
+            center_lat, center_lng = (min_lat + max_lat) / 2, (min_lng + max_lng) / 2
+            if min_lng > max_lng:
+                center_lng = center_lng - 180 if center_lng > 0 else center_lng + 180
+            return queryset.filter(within_boxes(split_box(min_lng, min_lat, max_lng, max_lat))).annotate(
+                distance_km=distance_km(center_lat, center_lng)
+            ).order_by("distance_km", "id")
+
+        return queryset
+
+    def filter_location(self, queryset, name, value):
+        # bbox/near/radius work together, so they're applied in filter_geo.
+        return queryset
+
+    def filter_dates(self, queryset, name, value):
+        # Both dates are needed together, so they're applied in filter_queryset.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        query = build_search_query(value)
+        if query is None:
+            return queryset
+
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+        )
+
+    def filter_city(self, queryset, name, value):
+        return queryset.filter(Q(city__icontains=value) | Q(city__trigram_similar=value))
+
+    def filter_ordering(self, queryset, name, value):
+        if value == "relevance" and "search_rank" in queryset.query.annotations:
+            return queryset.order_by("-search_rank", "-created_at", "-id")
+
+        if value == "rating":
+            return queryset.order_by("-avg_rating", "-id")
+
+        return queryset
+
+
+class ReservationFilter(django_filters.FilterSet):
+    status = django_filters.ChoiceFilter(
+        field_name="status", choices=[(status, status) for status in ("Booked", "Finished", "Reviewed")],
+        label="Booking status",
+    )
+    housing = django_filters.NumberFilter(field_name="housing_id", label="Housing id")
+    # A stay is in the window when it overlaps it at all.
+    date_from = django_filters.DateFilter(field_name="check_out_date", lookup_expr="gt", label="Stays ending after")
+    date_to = django_filters.DateFilter(field_name="check_in_date", lookup_expr="lt", label="Stays starting before")
+
+    class Meta:
+        model = Booking
+        fields = []
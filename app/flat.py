@@ -0,0 +1,93 @@
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from rest_framework import serializers
+
+VALUE, METHOD, NESTED = range(3)
+
+
+class FlatSerializer:
+    """
+    Read-only twin of a ModelSerializer that builds its output from `.values()` rows.
+
+    The serializer's fields are compiled once into (key, values path, converter) steps; per row only dict
+    lookups and the fields' own to_representation run, so the output matches the ModelSerializer's exactly.
+    SerializerMethodFields need a row-level counterpart in `Meta.row_methods`, fed the `Meta.method_sources` values.
+    """
+
+    def __init__(self, serializer, queryset):
+        self.paths = set()
+        self.steps = self.compile(serializer, queryset.model, queryset.query.annotations, "")
+        self.queryset = queryset
+
+    def compile(self, serializer, model, annotations, prefix):
+        meta = serializer.Meta
+        steps = []
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+
+            if isinstance(field, serializers.ListSerializer):
+                raise ImproperlyConfigured(f"{type(serializer).__name__}.{name}: to-many fields can't be read from rows.")
+
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in getattr(meta, "row_methods", {}):
+                    raise ImproperlyConfigured(f"{type(serializer).__name__}.{name} has no entry in Meta.row_methods.")
+                paths = [f"{prefix}{path}" for path in meta.method_sources[name]]
+                self.paths.update(paths)
+                steps.append((METHOD, name, paths, meta.row_methods[name]))
+                continue
+
+            path = f"{prefix}{'__'.join(field.source_attrs)}"
+
+            if isinstance(field, serializers.BaseSerializer):
+                nested_model = field.Meta.model
+                pk_path = f"{path}__{nested_model._meta.pk.name}"
+                self.paths.add(pk_path)
+                steps.append((NESTED, name, pk_path, self.compile(field, nested_model, {}, f"{path}__")))
+                continue
+
+            if not is_available(model, annotations, field.source_attrs):
+                # Same as DRF: a missing optional attribute (e.g. an annotation only some filters add) is left out.
+                if field.required:
+                    raise ImproperlyConfigured(f"{type(serializer).__name__}.{name}: {path} isn't a column or annotation.")
+                continue
+
+            self.paths.add(path)
+            steps.append((VALUE, name, path, field.to_representation))
+
+        return steps
+
+    def values(self, *extra):
+        """The queryset as `.values()` rows; `extra` adds columns the caller needs besides the payload (e.g. cursors)."""
+        return self.queryset.values(*self.paths, *extra)
+
+    def to_representation(self, row, steps=None):
+        data = {}
+
+        for kind, name, path, convert in self.steps if steps is None else steps:
+            if kind == VALUE:
+                value = row[path]
+                data[name] = None if value is None else convert(value)
+            elif kind == METHOD:
+                data[name] = convert(*[row[source] for source in path])
+            else:
+                data[name] = None if row[path] is None else self.to_representation(row, convert)
+
+        return data
+
+    def serialize(self, rows=None):
+        return [self.to_representation(row) for row in (self.values() if rows is None else rows)]
+
+
+def is_available(model, annotations, source_attrs):
+    if source_attrs[0] in annotations:
+        return True
+
+    for attr in source_attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        model = field.related_model
+
+    return True
@@ -0,0 +1,83 @@
+import math
+import operator
+from functools import reduce
+
+from django.db import models
+from django.db.models import F, Func, Value
+from django.db.models.functions import ASin, Cos, Least, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.045
+
+
+class Point(Func):
+    """Postgres `point(x, y)`; listings are indexed on point(longitude, latitude)."""
+    function = "point"
+    output_field = models.Field()
+
+
+class Box(Func):
+    function = "box"
+    output_field = models.Field()
+
+
+class ContainedIn(Func):
+    """`point <@ box`, answered by the GiST index on the listing location."""
+    arg_joiner = " <@ "
+    template = "(%(expressions)s)"
+    output_field = models.BooleanField()
+
+
+def housing_location():
+    return Point(F("longitude"), F("latitude"))
+
+
+def within_box(min_lng, min_lat, max_lng, max_lat):
+    corner_low = Point(Value(float(min_lng)), Value(float(min_lat)))
+    corner_high = Point(Value(float(max_lng)), Value(float(max_lat)))
+    return ContainedIn(housing_location(), Box(corner_low, corner_high))
+
+
+def within_boxes(boxes):
+    # Postgres answers the OR with a BitmapOr over the same GiST index.
+    return reduce(operator.or_, (within_box(*box) for box in boxes))
+
+
+def split_box(min_lng, min_lat, max_lng, max_lat) -> list:
+    """
+    The box as (min_lng, min_lat, max_lng, max_lat) tuples: one, or two when it crosses the antimeridian
+    (min_lng > max_lng). A Postgres box would silently swap the corners and cover the other side of the world.
+    """
+    if min_lng <= max_lng:
+        return [(min_lng, min_lat, max_lng, max_lat)]
+
+    return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+
+
+def box_around(lat, lng, radius_km) -> list:
+    """split_box() boxes enclosing the radius around a point, wrapping longitudes over the antimeridian."""
+    delta_lat = radius_km / KM_PER_DEGREE
+    delta_lng = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+    min_lat, max_lat = max(lat - delta_lat, -90.0), min(lat + delta_lat, 90.0)
+
+    # A circle over a pole takes in every longitude.
+    if min_lat == -90.0 or max_lat == 90.0 or delta_lng >= 180.0:
+        return [(-180.0, min_lat, 180.0, max_lat)]
+
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180.0:
+        min_lng += 360.0
+    if max_lng > 180.0:
+        max_lng -= 360.0
+
+    return split_box(min_lng, min_lat, max_lng, max_lat)
+
+
+def distance_km(lat, lng):
+    """Haversine distance between the listing and (lat, lng), in kilometres."""
+    lat, lng = float(lat), float(lng)
+    half_dlat = (Radians(F("latitude")) - math.radians(lat)) / 2
+    half_dlng = (Radians(F("longitude")) - math.radians(lng)) / 2
+    a = Power(Sin(half_dlat), 2) + math.cos(math.radians(lat)) * Cos(Radians(F("latitude"))) * Power(Sin(half_dlng), 2)
+
+    return models.ExpressionWrapper(2 * EARTH_RADIUS_KM * ASin(Sqrt(Least(a, 1.0))), output_field=models.FloatField())
@@ -0,0 +1,64 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from app.models import Housing, TypeOfHousing
+
+CITIES = [
+    ("Almaty", "Kazakhstan"), ("Astana", "Kazakhstan"), ("Shymkent", "Kazakhstan"),
+    ("Bishkek", "Kyrgyzstan"), ("Tashkent", "Uzbekistan"), ("Tbilisi", "Georgia"),
+    ("Istanbul", "Turkey"), ("Dubai", "UAE"), ("Berlin", "Germany"), ("Lisbon", "Portugal"),
+]
+ADJECTIVES = ["Cozy", "Sunny", "Quiet", "Spacious", "Modern", "Rustic", "Bright", "Charming", "Luxury", "Tiny"]
+NOUNS = ["Apartment", "Loft", "Villa", "Cabin", "Studio", "House", "Room", "Cottage", "Penthouse", "Flat"]
+WORDS = ["mountain", "view", "center", "park", "metro", "balcony", "garden", "lake", "sea", "market", "quiet", "family"]
+
+
+def seed_housings(count: int, batch_size: int = 5000, seed: int = 42) -> list:
+    """Bulk-insert `count` approved listings for benchmarks and return their ids."""
+    rnd = random.Random(seed)
+    owner, _ = get_user_model().objects.get_or_create(username="benchmark_host")
+    types = [TypeOfHousing.objects.create(name=noun) for noun in NOUNS]
+
+    ids = []
+    for start in range(0, count, batch_size):
+        batch = []
+        for _ in range(min(batch_size, count - start)):
+            city, country = rnd.choice(CITIES)
+            batch.append(Housing(
+                name=f"{rnd.choice(ADJECTIVES)} {rnd.choice(NOUNS)}",
+                owner=owner,
+                description=" ".join(rnd.choices(WORDS, k=12)),
+                address=f"{rnd.randint(1, 300)} Main street",
+                city=city,
+                country=country,
+                price=rnd.randint(10, 500),
+                option="Per day",
+                type=rnd.choice(types),
+                conveniences="WiFi",
+                status=True,
+            ))
+        ids.extend(housing.id for housing in Housing.objects.bulk_create(batch))
+
+    return ids
+
+
+def seed_bookings(housing_ids: list, count: int) -> None:
+    """Insert `count` bookings spread evenly over `housing_ids` in one INSERT ... SELECT."""
+    guest, _ = get_user_model().objects.get_or_create(username="benchmark_guest")
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO app_booking (owner_id, housing_id, check_in_date, check_out_date,
+                                     guests_amount, created_at, status)
+            SELECT %s,
+                   (%s::bigint[])[1 + g %% %s],
+                   DATE '2025-01-01' + (g / %s) * 30 + g %% 17,
+                   DATE '2025-01-01' + (g / %s) * 30 + g %% 17 + 1 + g %% 7,
+                   1, now(), 'Booked'
+            FROM generate_series(0, %s - 1) AS g
+            """,
+            [guest.id, housing_ids, len(housing_ids), len(housing_ids), len(housing_ids), count],
+        )
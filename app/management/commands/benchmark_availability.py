@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from app.filters import HousingFilter
+from app.models import Housing, Booking
+from ._seed import seed_housings, seed_bookings
+
+
+class Command(BaseCommand):
+    help = "Seed listings and bookings in a rolled-back transaction and compare availability queries."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=100_000)
+        parser.add_argument("--bookings", type=int, default=1_000_000)
+        parser.add_argument("--check-in", default="2025-03-02")
+        parser.add_argument("--check-out", default="2025-03-09")
+
+    def handle(self, *args, **options):
+        check_in, check_out = options["check_in"], options["check_out"]
+
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['listings']} listings and {options['bookings']} bookings...")
+            housing_ids = seed_housings(options["listings"])
+            seed_bookings(housing_ids, options["bookings"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE app_housing")
+                cursor.execute("ANALYZE app_booking")
+
+            base = Housing.objects.filter(status=True).order_by("-created_at", "-id")
+            taken = Booking.objects.filter(
+                housing=OuterRef("pk"), check_in_date__lt=check_out, check_out_date__gt=check_in,
+            )
+            naive = base.filter(~Exists(taken))
+            indexed = HousingFilter({"check_in": check_in, "check_out": check_out}, queryset=base).qs
+
+            for title, queryset in (("naive date columns", naive), ("daterange + GiST", indexed)):
+                self.report(f"{title}, first page", queryset[:30])
+                self.report(f"{title}, all free listings", queryset.values("id"))
+
+            transaction.set_rollback(True)
+
+    def report(self, title, queryset):
+        started = time.perf_counter()
+        rows = len(list(queryset))
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}: {rows} rows in {elapsed:.2f} ms"))
+        self.stdout.write(queryset.explain(analyze=True))
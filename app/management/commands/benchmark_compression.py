@@ -0,0 +1,72 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from app.flat import FlatSerializer
+from app.middleware import ENCODERS
+from app.models import Housing, Favorites, Review
+from app.renderers import FastJSONRenderer
+from app.serializer import HousingSerializer, FavoritesListSerializer, ReviewRetrieveSerializer
+from ._seed import seed_housings, WORDS
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 5, 6, 11), "zstd": (1, 3, 9, 19)}
+
+
+class Command(BaseCommand):
+    help = "Seed rows in a rolled-back transaction and compare bytes-on-wire and CPU per compression level."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reviews", type=int, default=2000)
+        parser.add_argument("--favorites", type=int, default=300)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        render = FastJSONRenderer().render
+        rnd = random.Random(7)
+
+        with transaction.atomic():
+            housing_ids = seed_housings(max(options["favorites"], 30))
+            guest, _ = get_user_model().objects.get_or_create(username="benchmark_guest")
+            Favorites.objects.bulk_create(
+                Favorites(favorites_owner=guest, favorites_housing_id=housing_id)
+                for housing_id in housing_ids[:options["favorites"]]
+            )
+            Review.objects.bulk_create(
+                Review(review_owner=guest, related_to_id=housing_ids[0], review_rating=rnd.randint(1, 5),
+                       review_text=" ".join(rnd.choices(WORDS, k=rnd.randint(5, 60))))
+                for _ in range(options["reviews"])
+            )
+
+            reviews = Review.objects.filter(related_to_id=housing_ids[0]).select_related("review_owner", "related_to")
+            payloads = [
+                (f"review/list, {options['reviews']} reviews", render(ReviewRetrieveSerializer(reviews, many=True).data)),
+                (f"favorites, {options['favorites']} listings",
+                 render(FlatSerializer(FavoritesListSerializer(), Favorites.objects.filter(favorites_owner=guest)).serialize())),
+                ("housing/list page, 30 listings", render({
+                    "next": "http://localhost/api/v1/housing/list/?cursor=cD0yMDI1", "previous": None,
+                    "results": FlatSerializer(HousingSerializer(), Housing.objects.order_by("-created_at")[:30]).serialize(),
+                })),
+            ]
+
+            transaction.set_rollback(True)
+
+        for title, body in payloads:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}: {len(body)} bytes uncompressed"))
+            for name, levels in LEVELS.items():
+                for level in levels:
+                    self.report(name, level, body, options["repeat"])
+
+    def report(self, name, level, body, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            compressed = ENCODERS[name](level).compress(body)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        self.stdout.write(
+            f"  {name:>4} level {level:>2}: {len(compressed):>9} bytes ({len(compressed) / len(body):6.1%}), "
+            f"{min(timings):8.3f} ms, {len(body) / 1024 / 1024 / (min(timings) / 1000):7.1f} MiB/s"
+        )
@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from app.flat import FlatSerializer
+from app.models import Housing, Booking, Review
+from app.renderers import FastJSONRenderer, MessagePackRenderer
+from app.serializer import HousingSerializer, UserBookingSerializer, ReviewRetrieveSerializer
+from ._seed import seed_housings, seed_bookings, WORDS
+
+
+class Command(BaseCommand):
+    help = "Seed rows in a rolled-back transaction and compare renderers on the API's response shapes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[30, 300, 3000])
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        largest = max(options["rows"])
+
+        with transaction.atomic():
+            housing_ids = seed_housings(largest)
+            seed_bookings(housing_ids, largest)
+            guest = get_user_model().objects.get(username="benchmark_guest")
+            Review.objects.bulk_create(
+                Review(review_owner=guest, related_to_id=housing_id, review_rating=4,
+                       review_text=" ".join(WORDS) * 3)
+                for housing_id in housing_ids
+            )
+
+            for size in options["rows"]:
+                housings = Housing.objects.order_by("-created_at", "-id")[:size]
+                bookings = Booking.objects.order_by("id")[:size]
+                reviews = Review.objects.select_related("review_owner", "related_to").order_by("id")[:size]
+
+                shapes = [
+                    ("housing/list page", {
+                        "next": "http://localhost/api/v1/housing/list/?cursor=cD0yMDI1", "previous": None,
+                        "results": FlatSerializer(HousingSerializer(), housings).serialize(),
+                    }),
+                    ("booking/list", FlatSerializer(UserBookingSerializer(), bookings).serialize()),
+                    ("review/list page", {
+                        "count": size, "next": None, "previous": None,
+                        "results": ReviewRetrieveSerializer(reviews, many=True).data,
+                    }),
+                ]
+
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n{size} rows"))
+                for title, data in shapes:
+                    self.compare(title, data, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def compare(self, title, data, repeat):
+        self.stdout.write(f"  {title}")
+        baseline = None
+
+        for renderer in (JSONRenderer(), FastJSONRenderer(), MessagePackRenderer()):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                body = renderer.render(data)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            best = min(timings)
+            baseline = baseline or best
+            self.stdout.write(
+                f"    {type(renderer).__name__:<20} {best:8.3f} ms {baseline / best:6.1f}x {len(body):>10} bytes"
+            )
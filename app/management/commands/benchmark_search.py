@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from app.filters import HousingFilter
+from app.models import Housing
+from ._seed import seed_housings
+
+
+class Command(BaseCommand):
+    help = "Seed listings in a rolled-back transaction and compare ILIKE search with the indexed search backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=100_000)
+        parser.add_argument("--search", default="sunny loft")
+        parser.add_argument("--city", default="Almatty")
+
+    def handle(self, *args, **options):
+        search = options["search"]
+        city = options["city"]
+
+        with transaction.atomic():
+            self.stdout.write(f"Seeding {options['listings']} listings...")
+            seed_housings(options["listings"])
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE app_housing")
+
+            base = Housing.objects.filter(status=True)
+            legacy = {
+                "legacy search (name ILIKE)": base.filter(name__icontains=search).order_by("-created_at"),
+                "legacy city (city ILIKE)": base.filter(city__icontains=city).order_by("-created_at"),
+            }
+            indexed = {
+                "full-text search (relevance)": HousingFilter(
+                    {"search": search, "ordering": "relevance"}, queryset=base
+                ).qs,
+                "trigram city": HousingFilter({"city": city}, queryset=base).qs.order_by("-created_at"),
+            }
+
+            for title, queryset in {**legacy, **indexed}.items():
+                self.report(title, queryset[:30])
+
+            transaction.set_rollback(True)
+
+    def report(self, title, queryset):
+        started = time.perf_counter()
+        rows = len(list(queryset))
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title}: {rows} rows in {elapsed:.2f} ms"))
+        self.stdout.write(queryset.explain(analyze=True))
@@ -0,0 +1,74 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from app.flat import FlatSerializer
+from app.models import Housing, Booking, Favorites
+from app.serializer import (
+    HousingSerializer, FavoritesListSerializer, UserBookingSerializer, MyHousingReservationSerializer,
+)
+from ._seed import seed_housings, seed_bookings
+
+
+class Command(BaseCommand):
+    help = "Seed rows in a rolled-back transaction and compare ModelSerializer and FlatSerializer list pages."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[30, 300, 3000])
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        largest = max(options["sizes"])
+
+        with transaction.atomic():
+            housing_ids = seed_housings(largest)
+            seed_bookings(housing_ids, largest)
+            guest = get_user_model().objects.get(username="benchmark_guest")
+            Favorites.objects.bulk_create(
+                Favorites(favorites_owner=guest, favorites_housing_id=housing_id) for housing_id in housing_ids
+            )
+
+            # The ModelSerializer side gets the joins the views used to add, so it isn't measured with N+1 queries.
+            endpoints = [
+                ("housing/list", HousingSerializer,
+                 Housing.objects.select_related("owner", "type").order_by("-created_at", "-id")),
+                ("favorites", FavoritesListSerializer,
+                 Favorites.objects.select_related("favorites_housing__type").order_by("id")),
+                ("booking/list", UserBookingSerializer, Booking.objects.select_related("housing").order_by("id")),
+                ("booking/manage", MyHousingReservationSerializer,
+                 Booking.objects.select_related("owner", "housing").order_by("-created_at")),
+            ]
+
+            for title, serializer_class, queryset in endpoints:
+                self.stdout.write(self.style.MIGRATE_HEADING(f"\n{title} ({serializer_class.__name__})"))
+                for size in options["sizes"]:
+                    self.compare(serializer_class, queryset[:size], size, options["repeat"])
+
+            transaction.set_rollback(True)
+
+    def compare(self, serializer_class, queryset, size, repeat):
+        # Querysets are cloned per run so neither side is served from the result cache.
+        model = self.best_of(repeat, lambda: serializer_class(queryset.all(), many=True).data)
+        flat = self.best_of(repeat, lambda: FlatSerializer(serializer_class(), queryset.all()).serialize())
+
+        render = JSONRenderer().render
+        identical = render(serializer_class(queryset.all(), many=True).data) == render(
+            FlatSerializer(serializer_class(), queryset.all()).serialize()
+        )
+
+        self.stdout.write(
+            f"  {size:>5} rows: ModelSerializer {model:8.2f} ms, FlatSerializer {flat:8.2f} ms, "
+            f"{model / flat:5.1f}x, identical output: {identical}"
+        )
+
+    def best_of(self, repeat, run):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        return min(timings)
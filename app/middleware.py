@@ -0,0 +1,174 @@
+import gzip
+import zlib
+
+import brotli
+import zstandard
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+# Bodies that gain nothing from a second compression pass.
+COMPRESSED_CONTENT_TYPES = (
+    "image/", "video/", "audio/", "font/woff", "application/zip", "application/gzip", "application/x-gzip",
+    "application/zstd", "application/x-brotli", "application/pdf", "application/octet-stream",
+)
+UNCOMPRESSED_EXCEPTIONS = ("image/svg+xml",)
+DEFAULT_LEVELS = {"zstd": 3, "br": 5, "gzip": 6}
+
+
+class GzipEncoder:
+    name = "gzip"
+
+    def __init__(self, level):
+        self.level = level
+        self.stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return gzip.compress(data, compresslevel=self.level, mtime=0)
+
+    def compress_chunk(self, data):
+        # Sync-flush every chunk so a streaming client sees data as soon as the view yields it.
+        return self.stream.compress(data) + self.stream.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.stream.flush()
+
+
+class BrotliEncoder:
+    name = "br"
+
+    def __init__(self, level):
+        self.level = level
+        self.stream = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return brotli.compress(data, quality=self.level)
+
+    def compress_chunk(self, data):
+        return self.stream.process(data) + self.stream.flush()
+
+    def finish(self):
+        return self.stream.finish()
+
+
+class ZstdEncoder:
+    name = "zstd"
+
+    def __init__(self, level):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.stream = self.compressor.compressobj()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def compress_chunk(self, data):
+        return self.stream.compress(data) + self.stream.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self.stream.flush()
+
+
+# Listed in server preference: used to break ties between equally weighted client codings.
+ENCODERS = {encoder.name: encoder for encoder in (ZstdEncoder, BrotliEncoder, GzipEncoder)}
+
+
+def parse_accept_encoding(header) -> dict:
+    codings = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if coding:
+            codings[coding.strip().lower()] = weight
+
+    return codings
+
+
+def choose_encoding(header):
+    codings = parse_accept_encoding(header)
+    candidates = [
+        (codings.get(name, codings.get("*", 0.0)), -preference, name)
+        for preference, name in enumerate(ENCODERS)
+    ]
+    weight, _, name = max(candidates)
+
+    return name if weight > 0 else None
+
+
+def is_compressible(content_type) -> bool:
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type in UNCOMPRESSED_EXCEPTIONS:
+        return True
+
+    return not content_type.startswith(COMPRESSED_CONTENT_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated zstd/brotli/gzip response compression.
+
+    Responses below RESPONSE_COMPRESSION_MIN_SIZE, already encoded ones and binary media are passed through;
+    streaming responses are compressed chunk by chunk with a flush after each one.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.min_size = getattr(settings, "RESPONSE_COMPRESSION_MIN_SIZE", 1024)
+        self.levels = {**DEFAULT_LEVELS, **getattr(settings, "RESPONSE_COMPRESSION_LEVELS", {})}
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if response.has_header("Content-Encoding") or not is_compressible(response.get("Content-Type", "")):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        # Whatever gets chosen, caches must keep one copy per coding.
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        name = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if name is None:
+            return response
+
+        encoder = ENCODERS[name](self.levels[name])
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.compress_async_stream(encoder, response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(encoder, response.streaming_content)
+            del response["Content-Length"]
+        else:
+            compressed = encoder.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The body is no longer byte-identical to what the strong tag was computed from.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+
+        response.headers["Content-Encoding"] = name
+
+        return response
+
+    @staticmethod
+    def compress_stream(encoder, chunks):
+        for chunk in chunks:
+            if chunk:
+                yield encoder.compress_chunk(chunk)
+        yield encoder.finish()
+
+    @staticmethod
+    async def compress_async_stream(encoder, chunks):
+        async for chunk in chunks:
+            if chunk:
+                yield encoder.compress_chunk(chunk)
+        yield encoder.finish()
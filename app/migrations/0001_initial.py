@@ -0,0 +1,92 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:34
+
+import app.models
+import app.storage
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TypeOfHousing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Housing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('description', models.TextField()),
+                ('address', models.CharField(max_length=150)),
+                ('city', models.CharField(max_length=100)),
+                ('country', models.CharField(max_length=100)),
+                ('rated_people', models.IntegerField(default=0)),
+                ('rating_amount', models.FloatField(default=0)),
+                ('price', models.IntegerField(default=0)),
+                ('option', models.CharField(choices=[('Per day', 'per day'), ('Per week', 'per week'), ('Per month', 'per month')])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('conveniences', models.TextField()),
+                ('status', models.BooleanField(default=False)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.typeofhousing')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Favorites',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('favorites_owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('favorites_housing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.housing')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HousingPhotos',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('photo', models.ImageField(blank=True, null=True, storage=app.storage.HousingStorage(), upload_to=app.models.housing_upload_location)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('is_wallpaper', models.BooleanField(default=False)),
+                ('housing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='photos', to='app.housing')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Review',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('review_text', models.TextField()),
+                ('review_date', models.DateField(auto_now=True)),
+                ('review_rating', models.IntegerField()),
+                ('related_to', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reviews', to='app.housing')),
+                ('review_owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('check_in_date', models.DateField()),
+                ('check_out_date', models.DateField()),
+                ('guests_amount', models.IntegerField(default=1)),
+                ('bill_to_pay', models.DecimalField(decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('status', models.CharField(choices=[('Booked', 'booked'), ('Finished', 'finished'), ('reviewed', 'Reviewed')], default='Booked')),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('housing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.housing')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('owner', 'housing', 'check_in_date', 'check_out_date'), name='unique_booking')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:39
+
+from django.db import migrations, models
+
+from app.storage import HousingStorage
+
+
+def backfill_wallpapers(apps, schema_editor):
+    Housing = apps.get_model("app", "Housing")
+    HousingPhotos = apps.get_model("app", "HousingPhotos")
+    storage = HousingStorage()
+
+    wallpapers = HousingPhotos.objects.filter(is_wallpaper=True).exclude(photo="").order_by("housing_id", "created_at")
+    updated = {}
+    for photo in wallpapers.iterator():
+        updated.setdefault(photo.housing_id, photo.photo.name)
+
+    Housing.objects.bulk_update(
+        [Housing(pk=pk, wallpaper_key=key, wallpaper_url=storage.url(key)) for pk, key in updated.items()],
+        ["wallpaper_key", "wallpaper_url"],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0002_housing_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='housing',
+            name='wallpaper_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='housing',
+            name='wallpaper_url',
+            field=models.CharField(blank=True, max_length=500, null=True),
+        ),
+        migrations.RunPython(backfill_wallpapers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('app', '0003_housing_wallpaper'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='housing',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='housing_status_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='housingphotos',
+            index=models.Index(fields=['housing', 'is_wallpaper'], name='photos_housing_wallpaper_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(fields=['related_to', '-review_date'], name='review_housing_date_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['housing', 'check_in_date', 'check_out_date'], name='booking_housing_dates_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['owner', 'status'], name='booking_owner_status_idx'),
+        ),
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM app_favorites AS duplicate
+                USING app_favorites AS kept
+                WHERE duplicate.favorites_owner_id = kept.favorites_owner_id
+                  AND duplicate.favorites_housing_id = kept.favorites_housing_id
+                  AND duplicate.id > kept.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql="""
+                        CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS unique_favorite
+                        ON app_favorites (favorites_owner_id, favorites_housing_id)
+                    """,
+                    reverse_sql="DROP INDEX CONCURRENTLY IF EXISTS unique_favorite",
+                ),
+                migrations.RunSQL(
+                    sql="ALTER TABLE app_favorites ADD CONSTRAINT unique_favorite UNIQUE USING INDEX unique_favorite",
+                    reverse_sql="ALTER TABLE app_favorites DROP CONSTRAINT IF EXISTS unique_favorite",
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='favorites',
+                    constraint=models.UniqueConstraint(
+                        fields=('favorites_owner', 'favorites_housing'), name='unique_favorite'
+                    ),
+                ),
+            ],
+        ),
+    ]
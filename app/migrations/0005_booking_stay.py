@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:44
+
+import django.contrib.postgres.fields.ranges
+import django.contrib.postgres.operations
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0004_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.AddField(
+            model_name='booking',
+            name='stay',
+            field=models.GeneratedField(db_persist=True, expression=models.Func('check_in_date', 'check_out_date', function='daterange', output_field=django.contrib.postgres.fields.ranges.DateRangeField()), output_field=django.contrib.postgres.fields.ranges.DateRangeField()),
+        ),
+    ]
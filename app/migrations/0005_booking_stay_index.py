@@ -0,0 +1,19 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, so the index is built apart from its columns.
+    atomic = False
+
+    dependencies = [
+        ('app', '0005_booking_stay'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=django.contrib.postgres.indexes.GistIndex(fields=['housing', 'stay'], name='booking_housing_stay_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0005_booking_stay_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='housing',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='housing',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+import app.geo
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, so the index is built apart from its columns.
+    atomic = False
+
+    dependencies = [
+        ('app', '0006_housing_location'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='housing',
+            index=django.contrib.postgres.indexes.GistIndex(app.geo.Point(models.F('longitude'), models.F('latitude')), name='housing_location_idx'),
+        ),
+    ]
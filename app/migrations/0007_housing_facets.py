@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0006_housing_location_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HousingFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filter_dimension', models.CharField(blank=True, max_length=20)),
+                ('filter_value', models.CharField(blank=True, max_length=100)),
+                ('dimension', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('filter_dimension', 'filter_value', 'dimension', 'value'), name='unique_housing_facet')],
+            },
+        ),
+    ]
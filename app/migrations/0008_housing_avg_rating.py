@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-17 23:50
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0007_housing_facets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='housing',
+            name='avg_rating',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Coalesce(django.db.models.functions.comparison.Cast(django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(models.F('rating_amount'), '/', django.db.models.functions.comparison.NullIf('rated_people', 0)), models.DecimalField(decimal_places=2, max_digits=6)), models.FloatField()), 0.0), output_field=models.FloatField()),
+        ),
+    ]
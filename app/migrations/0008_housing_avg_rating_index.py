@@ -0,0 +1,18 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction, so the index is built apart from its columns.
+    atomic = False
+
+    dependencies = [
+        ('app', '0008_housing_avg_rating'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='housing',
+            index=models.Index(fields=['status', '-avg_rating', '-id'], name='housing_status_rating_idx'),
+        ),
+    ]
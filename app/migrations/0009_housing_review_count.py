@@ -0,0 +1,36 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE/DROP INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('app', '0008_housing_avg_rating_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='housing',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE app_housing AS housing
+                SET review_count = reviews.total
+                FROM (SELECT related_to_id, COUNT(*) AS total FROM app_review GROUP BY related_to_id) AS reviews
+                WHERE housing.id = reviews.related_to_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        AddIndexConcurrently(
+            model_name='review',
+            index=models.Index(fields=['related_to', '-review_date', '-id'], name='review_housing_keyset_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='review',
+            name='review_housing_date_idx',
+        ),
+    ]
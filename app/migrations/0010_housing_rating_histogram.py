@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_housing_review_count'),
+    ]
+
+    operations = [
+        *(
+            migrations.AddField(
+                model_name='housing',
+                name=f'rating_{star}_count',
+                field=models.PositiveIntegerField(default=0),
+            )
+            for star in range(1, 6)
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE app_housing AS housing
+                SET rating_1_count = reviews.stars_1,
+                    rating_2_count = reviews.stars_2,
+                    rating_3_count = reviews.stars_3,
+                    rating_4_count = reviews.stars_4,
+                    rating_5_count = reviews.stars_5
+                FROM (
+                    SELECT related_to_id,
+                           COUNT(*) FILTER (WHERE review_rating = 1) AS stars_1,
+                           COUNT(*) FILTER (WHERE review_rating = 2) AS stars_2,
+                           COUNT(*) FILTER (WHERE review_rating = 3) AS stars_3,
+                           COUNT(*) FILTER (WHERE review_rating = 4) AS stars_4,
+                           COUNT(*) FILTER (WHERE review_rating = 5) AS stars_5
+                    FROM app_review
+                    GROUP BY related_to_id
+                ) AS reviews
+                WHERE housing.id = reviews.related_to_id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:15
+
+import django.contrib.postgres.constraints
+from django.conf import settings
+from django.db import migrations
+
+# Overlapping pairs listed when the constraint can't be added; the rest are only counted.
+REPORTED_OVERLAPS = 50
+
+
+def check_overlapping_bookings(apps, schema_editor):
+    """
+    Fail with the conflicting bookings instead of a bare constraint error. Which of two stays to keep is a call
+    for support (refund, move the guest), so nothing is cancelled here.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        # Served by booking_housing_stay_idx, which is only dropped after the constraint exists.
+        cursor.execute("""
+            SELECT first.housing_id, first.id, first.check_in_date, first.check_out_date,
+                   second.id, second.check_in_date, second.check_out_date
+            FROM app_booking AS first
+            JOIN app_booking AS second
+              ON second.housing_id = first.housing_id AND second.id > first.id AND second.stay && first.stay
+            ORDER BY first.housing_id, first.id, second.id
+        """)
+        overlaps = cursor.fetchall()
+
+    if not overlaps:
+        return
+
+    lines = [
+        f"  housing {housing_id}: booking {first_id} ({first_in} - {first_out}) "
+        f"overlaps booking {second_id} ({second_in} - {second_out})"
+        for housing_id, first_id, first_in, first_out, second_id, second_in, second_out in overlaps[:REPORTED_OVERLAPS]
+    ]
+    if len(overlaps) > REPORTED_OVERLAPS:
+        lines.append(f"  ... and {len(overlaps) - REPORTED_OVERLAPS} more")
+
+    raise RuntimeError(
+        f"{len(overlaps)} overlapping booking pair(s) prevent adding booking_no_overlap. Delete or move one booking "
+        "of each pair, then run the migration again:\n" + "\n".join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_housing_rating_histogram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_overlapping_bookings, migrations.RunPython.noop),
+        # Exclusion constraints can't be built CONCURRENTLY, so the GiST build holds an ACCESS EXCLUSIVE lock on
+        # app_booking. Give up quickly rather than queue every booking request behind a long-running transaction.
+        migrations.RunSQL("SET LOCAL lock_timeout = '5s'", migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(expressions=[('housing', '='), ('stay', '&&')], name='booking_no_overlap'),
+        ),
+        migrations.RemoveIndex(
+            model_name='booking',
+            name='booking_housing_stay_idx',
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.6 on 2026-10-18 00:56
+
+from django.conf import settings
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ('app', '0011_booking_no_overlap'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='booking',
+            index=models.Index(fields=['status', '-created_at', '-id'], name='booking_status_keyset_idx'),
+        ),
+    ]
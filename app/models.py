@@ -1,8 +1,20 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex, GistIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Cast, Coalesce, NullIf, Upper
+from .cache import bump_catalog_generation, bump_availability_generation, mark_housing_facets_dirty
+from .geo import housing_location
 from .storage import HousingStorage
 
 
+RATING_STARS = range(1, 6)
+BOOKING_OVERLAP_CONSTRAINT = "booking_no_overlap"
+
+
 def housing_upload_location(instance, filename):
     return f"{instance.pk}/{filename}"
 
@@ -16,6 +28,24 @@ class Housing(models.Model):
     country = models.CharField(max_length=100)
     rated_people = models.IntegerField(default=0)
     rating_amount = models.FloatField(default=0)
+    # Kept in step with the reviews by record_rating, so pages can show totals without aggregating the reviews.
+    review_count = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    avg_rating = models.GeneratedField(
+        expression=Coalesce(
+            Cast(
+                Cast(F("rating_amount") / NullIf("rated_people", 0), models.DecimalField(max_digits=6, decimal_places=2)),
+                models.FloatField(),
+            ),
+            0.0,
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
     price = models.IntegerField(default=0)
     option = models.CharField(choices=(
         ('Per day', 'per day'), ('Per week', 'per week'), ('Per month', 'per month'),
@@ -24,11 +54,126 @@ class Housing(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     conveniences = models.TextField(null=False, blank=False)
     status = models.BooleanField(default=False)
+    wallpaper_key = models.CharField(max_length=255, null=True, blank=True)
+    wallpaper_url = models.CharField(max_length=500, null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("city", "country", weight="B", config="english")
+            + SearchVector("description", weight="C", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="housing_search_vector_idx"),
+            GinIndex(fields=["city"], opclasses=["gin_trgm_ops"], name="housing_city_trgm_idx"),
+            GinIndex(OpClass(Upper("city"), name="gin_trgm_ops"), name="housing_city_upper_trgm_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="housing_status_created_idx"),
+            models.Index(fields=["status", "-avg_rating", "-id"], name="housing_status_rating_idx"),
+            GistIndex(housing_location(), name="housing_location_idx"),
+        ]
+
+    # Fields that show up on public listing pages; changing them bumps the catalog generation.
+    CATALOG_FIELDS = (
+        "status", "name", "description", "address", "city", "country", "price", "option", "type_id", "owner_id",
+        "rated_people", "rating_amount", "wallpaper_key", "latitude", "longitude",
+    )
+    # Fields the facet table is grouped by; changing them marks the old and new facet values dirty.
+    FACET_FIELDS = ("status", "type_id", "city", "country", "price")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance.get_tracked_values()
+        return instance
+
+    def get_tracked_values(self):
+        return {field: self.__dict__.get(field) for field in (*self.CATALOG_FIELDS, *self.FACET_FIELDS)}
+
+    def save(self, *args, **kwargs):
+        previous = {} if self._state.adding else getattr(self, "_loaded_values", None)
+
+        super().save(*args, **kwargs)
+
+        current = self.get_tracked_values()
+        if previous is None:
+            changed = set(current)
+        else:
+            changed = {field for field, value in current.items() if previous.get(field) != value}
+
+        if changed & set(self.CATALOG_FIELDS):
+            transaction.on_commit(bump_catalog_generation)
+        if changed & set(self.FACET_FIELDS):
+            dirty = [values for values in (previous, current) if values]
+            transaction.on_commit(lambda: mark_housing_facets_dirty(*dirty))
+
+        self._loaded_values = current
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(bump_catalog_generation)
+        return result
+
+    def record_rating(self, rating):
+        """Count a new review in one UPDATE, so concurrent reviews never overwrite each other's totals."""
+        star = f"rating_{rating}_count"
+        Housing.objects.filter(pk=self.pk).update(
+            rated_people=F("rated_people") + 1,
+            rating_amount=F("rating_amount") + rating,
+            review_count=F("review_count") + 1,
+            **{star: F(star) + 1},
+        )
+        # update() bypasses save(), and the rating is shown on listing pages.
+        transaction.on_commit(bump_catalog_generation)
+
+    def forget_rating(self, rating):
+        """Take a deleted review back out of the totals, in one UPDATE like record_rating."""
+        star = f"rating_{rating}_count"
+        Housing.objects.filter(pk=self.pk).update(
+            rated_people=F("rated_people") - 1,
+            rating_amount=F("rating_amount") - rating,
+            review_count=F("review_count") - 1,
+            **{star: F(star) - 1},
+        )
+        transaction.on_commit(bump_catalog_generation)
+
+    def rating_histogram(self):
+        return {str(star): getattr(self, f"rating_{star}_count") for star in RATING_STARS}
+
+    def sync_wallpaper(self, photo=None):
+        """Copy the wallpaper's storage key and public URL onto the listing row."""
+        if photo is None:
+            photo = self.photos.order_by("-is_wallpaper", "created_at", "id").first()
+
+        if photo is not None and not photo.is_wallpaper:
+            photo.is_wallpaper = True
+            photo.save(update_fields=["is_wallpaper"])
+
+        if photo is not None and photo.photo:
+            self.wallpaper_key = photo.photo.name
+            self.wallpaper_url = photo.photo.url
+        else:
+            self.wallpaper_key = None
+            self.wallpaper_url = None
+
+        self.save(update_fields=["wallpaper_key", "wallpaper_url"])
 
 
 class TypeOfHousing(models.Model):
     name = models.CharField(max_length=100)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Facet rows carry the name, so a rename has to refresh the slice under the old one as well.
+        instance._loaded_name = instance.__dict__.get("name")
+        return instance
+
 
 class HousingPhotos(models.Model):
     housing = models.ForeignKey(Housing, on_delete=models.CASCADE, related_name='photos')
@@ -36,12 +181,22 @@ class HousingPhotos(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     is_wallpaper = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["housing", "is_wallpaper"], name="photos_housing_wallpaper_idx"),
+        ]
+
     def delete(self, *args, **kwargs):
         if self.photo:
             storage = HousingStorage()
             storage.delete(self.photo)
 
-        super().delete(*args, **kwargs)
+        result = super().delete(*args, **kwargs)
+
+        if self.is_wallpaper:
+            self.housing.sync_wallpaper()
+
+        return result
 
 
 class Review(models.Model):
@@ -51,11 +206,24 @@ class Review(models.Model):
     review_rating = models.IntegerField(null=False, blank=False)
     related_to = models.ForeignKey(Housing, on_delete=models.CASCADE, null=False, blank=False, related_name='reviews')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["related_to", "-review_date", "-id"], name="review_housing_keyset_idx"),
+        ]
+
 
 class Favorites(models.Model):
     favorites_owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, null=False, blank=False)
     favorites_housing = models.ForeignKey(Housing, on_delete=models.CASCADE, null=False, blank=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['favorites_owner', 'favorites_housing'],
+                name='unique_favorite'
+            )
+        ]
+
 
 class Booking(models.Model):
     owner = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, null=False, blank=False)
@@ -66,11 +234,53 @@ class Booking(models.Model):
     bill_to_pay = models.DecimalField(max_digits=10, decimal_places=2, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(choices=[("Booked", "booked"), ("Finished", "finished"), ("reviewed", "Reviewed")], null=False, blank=False, default="Booked")
+    stay = models.GeneratedField(
+        expression=models.Func("check_in_date", "check_out_date", function="daterange", output_field=DateRangeField()),
+        output_field=DateRangeField(),
+        db_persist=True,
+    )
 
     class Meta:
         constraints = [
             models.UniqueConstraint(
                 fields=['owner', 'housing', 'check_in_date', 'check_out_date'],
                 name='unique_booking'
+            ),
+            # Stays are half-open [check_in, check_out), so a check-out and the next check-in can share a day.
+            # The constraint's GiST index on (housing, stay) also serves the availability lookups.
+            ExclusionConstraint(
+                name=BOOKING_OVERLAP_CONSTRAINT,
+                expressions=[("housing", RangeOperators.EQUAL), ("stay", RangeOperators.OVERLAPS)],
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["housing", "check_in_date", "check_out_date"], name="booking_housing_dates_idx"),
+            models.Index(fields=["owner", "status"], name="booking_owner_status_idx"),
+            models.Index(fields=["status", "-created_at", "-id"], name="booking_status_keyset_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        transaction.on_commit(bump_availability_generation)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(bump_availability_generation)
+        return result
+
+
+class HousingFacet(models.Model):
+    """Precomputed listing counts per facet value, overall ("" filter) and within every single-filter slice."""
+    filter_dimension = models.CharField(max_length=20, blank=True)
+    filter_value = models.CharField(max_length=100, blank=True)
+    dimension = models.CharField(max_length=20)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['filter_dimension', 'filter_value', 'dimension', 'value'],
+                name='unique_housing_facet'
             )
         ]
@@ -0,0 +1,140 @@
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .cache import get_redis
+from .models import Booking
+
+# Bit n of a housing's bitmap is the night starting EPOCH + n days; a set bit means some stay covers it.
+EPOCH = date(2020, 1, 1)
+# Every booking write patches the bitmap, so the TTL only bounds what a lost patch can leave behind.
+OCCUPANCY_TIMEOUT = 60 * 60 * 24
+MAX_CALENDAR_MONTHS = 12
+
+# Bumps the housing's version (KEYS[2]), then sets (ARGV[3] = 1) or clears bits ARGV[1]..ARGV[2]-1 of its
+# bitmap (KEYS[1]) if there is one. A missing bitmap is rebuilt from Booking, which already has this change;
+# the version bump is what keeps a rebuild that read Booking before the change from storing its bitmap.
+PATCH_OCCUPANCY_SCRIPT = """
+redis.call("INCR", KEYS[2])
+redis.call("EXPIRE", KEYS[2], ARGV[4])
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+for offset = tonumber(ARGV[1]), tonumber(ARGV[2]) - 1 do
+    redis.call("SETBIT", KEYS[1], offset, ARGV[3])
+end
+return 1
+"""
+
+# Stores a rebuilt bitmap (ARGV[1]) unless a patch bumped the version (KEYS[2]) away from ARGV[2], the one
+# read before the rebuild queried Booking, or another rebuild already stored one.
+STORE_OCCUPANCY_SCRIPT = """
+if (redis.call("GET", KEYS[2]) or "") ~= ARGV[2] then
+    return 0
+end
+return redis.call("SET", KEYS[1], ARGV[1], "EX", ARGV[3], "NX") and 1 or 0
+"""
+
+_patch_occupancy_script = None
+_store_occupancy_script = None
+
+
+def occupancy_key(housing_id) -> str:
+    return f"occupancy:{housing_id}"
+
+
+def occupancy_version_key(housing_id) -> str:
+    return f"occupancy_version:{housing_id}"
+
+
+def day_offset(day) -> int:
+    return max((day - EPOCH).days, 0)
+
+
+def build_bitmap(stays) -> bytes:
+    """Pack [check_in, check_out) stays into Redis bit order: bit 0 is the high bit of the first byte."""
+    bitmap = bytearray()
+    for check_in, check_out in stays:
+        for offset in range(day_offset(check_in), day_offset(check_out)):
+            if offset // 8 >= len(bitmap):
+                bitmap.extend(bytes(offset // 8 - len(bitmap) + 1))
+            bitmap[offset // 8] |= 0x80 >> (offset % 8)
+
+    return bytes(bitmap)
+
+
+def load_occupancy(housing_id) -> bytes:
+    """Rebuild the bitmap from Booking and store it, unless a booking write raced with the rebuild."""
+    global _store_occupancy_script
+
+    if _store_occupancy_script is None:
+        _store_occupancy_script = get_redis().register_script(STORE_OCCUPANCY_SCRIPT)
+
+    version = get_redis().get(occupancy_version_key(housing_id)) or b""
+    stays = Booking.objects.filter(housing_id=housing_id).values_list("check_in_date", "check_out_date")
+    bitmap = build_bitmap(stays)
+
+    _store_occupancy_script(
+        keys=[occupancy_key(housing_id), occupancy_version_key(housing_id)], args=[bitmap, version, OCCUPANCY_TIMEOUT],
+    )
+
+    return bitmap
+
+
+def patch_occupancy(housing_id, check_in, check_out, occupied) -> None:
+    global _patch_occupancy_script
+
+    if _patch_occupancy_script is None:
+        _patch_occupancy_script = get_redis().register_script(PATCH_OCCUPANCY_SCRIPT)
+
+    _patch_occupancy_script(
+        keys=[occupancy_key(housing_id), occupancy_version_key(housing_id)],
+        args=[day_offset(check_in), day_offset(check_out), int(occupied), OCCUPANCY_TIMEOUT],
+    )
+
+
+def patch_occupancy_on_commit(booking, occupied) -> None:
+    stay = (booking.housing_id, booking.check_in_date, booking.check_out_date)
+    transaction.on_commit(lambda: patch_occupancy(*stay, occupied))
+
+
+def month_range(start, months) -> tuple:
+    year, month = divmod(start.year * 12 + start.month - 1 + months, 12)
+
+    return start, date(year, month + 1, 1)
+
+
+def read_calendar(housing_id, start, months, bitmap=None) -> list | None:
+    """
+    Booked days per month for `months` months from `start` (the first of a month), read with one GETRANGE,
+    or from `bitmap` when the caller just rebuilt it. Returns None when the bitmap is missing.
+    """
+    first, end = month_range(start, months)
+    first_offset, end_offset = day_offset(first), day_offset(end)
+
+    if bitmap is None:
+        pipe = get_redis().pipeline()
+        pipe.exists(occupancy_key(housing_id))
+        pipe.getrange(occupancy_key(housing_id), first_offset // 8, (end_offset - 1) // 8)
+        exists, chunk = pipe.execute()
+        if not exists:
+            return None
+    else:
+        chunk = bitmap[first_offset // 8:(end_offset - 1) // 8 + 1]
+
+    def is_booked(day):
+        offset = day_offset(day) - first_offset // 8 * 8
+        return offset // 8 < len(chunk) and bool(chunk[offset // 8] & (0x80 >> (offset % 8)))
+
+    result = []
+    month_start = first
+    while month_start < end:
+        days = calendar.monthrange(month_start.year, month_start.month)[1]
+        result.append({
+            "month": month_start.strftime("%Y-%m"),
+            "booked": [day for day in range(1, days + 1) if is_booked(month_start.replace(day=day))],
+        })
+        month_start += timedelta(days=days)
+
+    return result
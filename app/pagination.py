@@ -0,0 +1,159 @@
+import binascii
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination, CursorPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset) -> int:
+    """Planner row estimate for a queryset, used instead of an exact COUNT(*)."""
+    sql, params = queryset.order_by().query.sql_with_params()
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class HousingPagination(PageNumberPagination):
+    page_size = 30
+    page_size_query_param = 'page_size'
+
+
+class HousingCursorPagination(CursorPagination):
+    page_size = 30
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+    estimate_query_param = "with_total"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.estimated_total = None
+
+        if request.query_params.get(self.estimate_query_param) in ("1", "true"):
+            self.estimated_total = estimate_count(queryset)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+
+        if self.estimated_total is not None:
+            payload["estimated_total"] = self.estimated_total
+
+        payload["results"] = data
+
+        return Response(payload)
+
+
+class KeysetPagination:
+    """
+    Base for the keyset paginators: the opaque cursor doesn't depend on the request, so pages can be built
+    (and cached) outside of one.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    max_page_size = 100
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+
+        return min(max(page_size, 1), self.max_page_size)
+
+
+class ReviewPagination(KeysetPagination):
+    """
+    Keyset pagination on (review_date, id), newest first.
+
+    Every page is one range scan on review_housing_keyset_idx however deep it is.
+    """
+
+    @staticmethod
+    def encode_cursor(review) -> str:
+        return urlsafe_b64encode(f"{review.review_date.isoformat()}|{review.id}".encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+
+        try:
+            review_date, review_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return date.fromisoformat(review_date), int(review_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound("Invalid cursor")
+
+    def paginate_queryset(self, queryset, cursor, page_size):
+        """One page of `queryset` after `cursor`, and the cursor of the page after it (None on the last page)."""
+        queryset = queryset.order_by("-review_date", "-id")
+
+        position = self.decode_cursor(cursor)
+        if position is not None:
+            review_date, review_id = position
+            queryset = queryset.filter(review_date__lte=review_date).exclude(review_date=review_date, id__gte=review_id)
+
+        page = list(queryset[:page_size + 1])
+        next_cursor = self.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+
+        return page[:page_size], next_cursor
+
+
+class ReservationPagination(KeysetPagination):
+    """
+    Keyset pagination over a host's bookings on (status, created_at, id), served by booking_status_keyset_idx:
+    upcoming stays first, then finished and reviewed ones (the statuses sort in that order), newest booking
+    first within each status.
+
+    Pages are `.values()` rows, which must carry status and created_at.
+    """
+    page_size = 30
+
+    @staticmethod
+    def encode_cursor(row) -> str:
+        position = f"{row['status']}|{row['created_at'].isoformat()}|{row['id']}"
+        return urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+
+        try:
+            status, created_at, booking_id = urlsafe_b64decode(cursor.encode()).decode().split("|")
+            return status, datetime.fromisoformat(created_at), int(booking_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise NotFound("Invalid cursor")
+
+    def paginate_queryset(self, queryset, cursor, page_size):
+        """One page of `queryset` after `cursor`, and the cursor of the page after it (None on the last page)."""
+        queryset = queryset.order_by("status", "-created_at", "-id")
+
+        position = self.decode_cursor(cursor)
+        if position is not None:
+            status, created_at, booking_id = position
+            queryset = queryset.filter(
+                Q(status__gt=status)
+                | Q(status=status, created_at__lt=created_at)
+                | Q(status=status, created_at=created_at, id__lt=booking_id)
+            )
+
+        page = list(queryset[:page_size + 1])
+        next_cursor = self.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+
+        return page[:page_size], next_cursor
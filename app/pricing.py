@@ -0,0 +1,97 @@
+from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .cache import set_many_tagged, housing_tag, TAGGED_TIMEOUT
+from .models import Housing
+
+# Nights covered by one `price` for each Housing.option.
+PERIOD_NIGHTS = {"Per day": 1, "Per week": 7, "Per month": 30}
+MAX_QUOTE_NIGHTS = 365
+CENT = Decimal("0.01")
+# Friday and Saturday nights.
+WEEKEND_NIGHTS = (4, 5)
+
+
+def price_table_key(housing_id) -> str:
+    return f"price_table_{housing_id}"
+
+
+def build_price_table(housing) -> dict:
+    price = Decimal(housing.price)
+
+    return {"price": price, "option": housing.option, "nightly": price / PERIOD_NIGHTS[housing.option]}
+
+
+def get_price_tables(housing_ids) -> dict:
+    """
+    Price tables by housing id, from the cache or one query for the misses. Unknown and unapproved ids are
+    left out, so only listings that can be booked get quoted.
+    """
+    cache_keys = {housing_id: price_table_key(housing_id) for housing_id in housing_ids}
+    cached = cache.get_many(cache_keys.values())
+    tables = {housing_id: cached[cache_key] for housing_id, cache_key in cache_keys.items() if cache_key in cached}
+
+    missing = [housing_id for housing_id in cache_keys if housing_id not in tables]
+    if missing:
+        # Tagged with the housing, so a price, option or approval change drops the table with its other payloads.
+        housings = Housing.objects.filter(pk__in=missing, status=True).only("price", "option")
+        built = {housing.id: build_price_table(housing) for housing in housings}
+        set_many_tagged(
+            {cache_keys[housing_id]: table for housing_id, table in built.items()}, TAGGED_TIMEOUT,
+            {cache_keys[housing_id]: [housing_tag(housing_id)] for housing_id in built},
+        )
+        tables.update(built)
+
+    return tables
+
+
+def weekend_rate(nights) -> list:
+    rate = Decimal(str(getattr(settings, "PRICE_WEEKEND_RATE", 1)))
+
+    return [rate if night.weekday() in WEEKEND_NIGHTS else 1 for night in nights]
+
+
+def seasonal_rate(nights) -> list:
+    # Seasons are ("MM-DD", "MM-DD", rate), both ends inclusive; a start after the end wraps over the new year.
+    seasons = [(start, end, Decimal(str(rate))) for start, end, rate in getattr(settings, "PRICE_SEASONAL_RATES", ())]
+    rates = []
+    for night in nights:
+        day = night.strftime("%m-%d")
+        rate = 1
+        for start, end, season_rate in seasons:
+            if (start <= day <= end) if start <= end else (day >= start or day <= end):
+                rate *= season_rate
+        rates.append(rate)
+
+    return rates
+
+
+# Each rule maps the nights of a stay to per-night multipliers. Rules only see the dates, so a single
+# factor vector prices every housing in a batch quote.
+RATE_RULES = [weekend_rate, seasonal_rate]
+
+
+def night_factors(check_in, check_out) -> list:
+    nights = [check_in + timedelta(days=offset) for offset in range((check_out - check_in).days)]
+    factors = [Decimal(1)] * len(nights)
+
+    for rule in RATE_RULES:
+        factors = [factor * rate for factor, rate in zip(factors, rule(nights))]
+
+    return factors
+
+
+def quote_total(table, factors) -> Decimal:
+    return (table["nightly"] * sum(factors)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def quote(table, factors) -> dict:
+    return {
+        "price": str(table["price"]),
+        "option": table["option"],
+        "nightly_rate": str(table["nightly"].quantize(CENT, rounding=ROUND_HALF_UP)),
+        "total": str(quote_total(table, factors)),
+    }
@@ -1,29 +1,109 @@
 from datetime import date
 from rest_framework import serializers
-from app.models import Housing, Favorites, Review, HousingPhotos, Booking
+from app.models import Housing, Favorites, Review, HousingPhotos, Booking, RATING_STARS
+from app.pricing import MAX_QUOTE_NIGHTS
 
 ALLOWED_CONTENT_TYPES = ["image/jpeg", "image/png", "image/webp"]
 MAX_FILE_SIZE = 10 * 1024 * 1024
+SPARSE_FIELDS_PARAMS = ("fields", "omit")
 
 
-class HousingSerializer(serializers.ModelSerializer):
+def get_sparse_fields(request) -> dict:
+    """`?fields=a,b` / `?omit=c` as serializer kwargs."""
+    selection = {}
+    for param in SPARSE_FIELDS_PARAMS:
+        value = request.query_params.get(param)
+        if value:
+            selection[param] = {name.strip() for name in value.split(",") if name.strip()}
+
+    return selection
+
+
+def apply_sparse_fields(data, fields=None, omit=None, required=("id",)):
+    """Trim an already serialized (e.g. cached) payload the same way SparseFieldsMixin trims fields."""
+    if isinstance(data, list):
+        return [apply_sparse_fields(item, fields, omit, required) for item in data]
+
+    return {
+        key: value for key, value in data.items()
+        if key in required or ((not fields or key in fields) and key not in (omit or ()))
+    }
+
+
+def format_booked_date(created_at):
+    return created_at.strftime("%m-%d-%Y")
+
+
+def is_upcoming(check_out_date):
+    return check_out_date > date.today()
+
+
+class SparseFieldsMixin:
+    """
+    Lets callers drop fields with `fields=`/`omit=` and tells views which columns the kept fields need,
+    so the queryset can be trimmed with .only() as well.
+    """
+    required_fields = ("id",)
+
+    def __init__(self, *args, fields=None, omit=None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        for name in list(self.fields):
+            if name in self.required_fields:
+                continue
+            if (fields and name not in fields) or (omit and name in omit):
+                self.fields.pop(name)
+
+    def get_only_fields(self, prefix=""):
+        model_fields = {field.name for field in self.Meta.model._meta.concrete_fields}
+        method_sources = getattr(self.Meta, "method_sources", {})
+        only = {f"{prefix}id"}
+
+        for name, field in self.fields.items():
+            if isinstance(field, serializers.ListSerializer):
+                continue
+            if isinstance(field, SparseFieldsMixin):
+                only |= field.get_only_fields(f"{prefix}{'__'.join(field.source_attrs)}__")
+                continue
+
+            if isinstance(field, serializers.SerializerMethodField):
+                paths = method_sources.get(name, ())
+            else:
+                paths = ["__".join(field.source_attrs)]
+
+            only.update(f"{prefix}{path}" for path in paths if path.split("__")[0] in model_fields)
+
+        return only
+
+
+def trim_queryset(queryset, only_fields):
+    """Select only the needed columns and join only the relations they go through."""
+    relations = set()
+    for path in only_fields:
+        parts = path.split("__")[:-1]
+        relations.update("__".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+    queryset = queryset.select_related(None)
+    # select_related() without arguments would follow every foreign key.
+    if relations:
+        queryset = queryset.select_related(*relations)
+
+    return queryset.only(*only_fields)
+
+
+class HousingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     owner_username = serializers.CharField(source='owner.username')
-    rating = serializers.SerializerMethodField()
+    rating = serializers.FloatField(source="avg_rating", read_only=True)
     type_name = serializers.CharField(source='type.name')
-    wallpaper = serializers.CharField()
-    is_favorite = serializers.BooleanField(read_only=True)
+    wallpaper = serializers.CharField(source="wallpaper_key", read_only=True)
+    distance_km = serializers.FloatField(read_only=True)
+    required_fields = ("id",)
 
     class Meta:
         model = Housing
         fields = ['id', 'owner_username', 'description',
-                  'address', 'city', 'country',
-                  'price', 'option', 'rating', 'type_name', "wallpaper", "is_favorite", "name"]
-
-    def get_rating(self, obj):
-        if obj.rating_amount == 0:
-            return 0
-
-        return round(obj.rating_amount / obj.rated_people, 2)
+                  'address', 'city', 'country', 'latitude', 'longitude',
+                  'price', 'option', 'rating', 'type_name', "wallpaper", "name", "distance_km"]
 
 
 class AddToFavoritesSerializer(serializers.Serializer):
@@ -40,27 +120,16 @@ class HousingFavoritesSerializer(serializers.ModelSerializer):
 
 class FavoritesListSerializer(serializers.ModelSerializer):
     housing = HousingFavoritesSerializer(source="favorites_housing")
-    wallpaper_photo = serializers.SerializerMethodField()
+    wallpaper_photo = serializers.CharField(source="favorites_housing.wallpaper_url", read_only=True)
 
     class Meta:
         model = Favorites
         fields = ["housing", "wallpaper_photo"]
 
-    def get_wallpaper_photo(self, obj):
-        photos = getattr(obj.favorites_housing, "wallpaper_photo", [])
-        if photos:
-            photo_instance = photos[0]
-            if photo_instance.photo and photo_instance.photo.name:
-                try:
-                    return photo_instance.photo.url
-                except ValueError:
-                    return None
-        return None
-
 
 class ReviewSerializer(serializers.Serializer):
     housing_id = serializers.IntegerField(required=True)
-    rating = serializers.FloatField(required=True)
+    rating = serializers.IntegerField(required=True, min_value=1, max_value=5)
     text = serializers.CharField(required=True)
 
 
@@ -107,7 +176,11 @@ class AddHousingSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Housing
-        fields = ['images', 'name', 'description', 'address', 'city', 'country', 'price', 'option', 'type']
+        fields = ['images', 'name', 'description', 'address', 'city', 'country', 'latitude', 'longitude', 'price', 'option', 'type']
+        extra_kwargs = {
+            'latitude': {'min_value': -90, 'max_value': 90},
+            'longitude': {'min_value': -180, 'max_value': 180},
+        }
 
     def create(self, validated_data):
         images_data = self.context['request'].data.getlist('images')
@@ -128,6 +201,9 @@ class AddHousingSerializer(serializers.ModelSerializer):
 
         HousingPhotos.objects.bulk_create(saved_images)
 
+        if saved_images:
+            housing.sync_wallpaper(saved_images[0])
+
         return housing
 
 
@@ -156,27 +232,26 @@ class ReviewsSerializer(serializers.ModelSerializer):
             return None
 
 
-class HousingDetailsSerializer(serializers.ModelSerializer):
+class HousingDetailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     photos = HousingPhotosSerializer(many=True, read_only=True)
     type = serializers.CharField(source="type.name")
     owner = serializers.CharField(source="owner.username")
     owner_pfp = serializers.SerializerMethodField()
     owner_date_join = serializers.SerializerMethodField()
-    rating = serializers.SerializerMethodField()
-    review_amount = serializers.IntegerField(read_only=True)
+    rating = serializers.FloatField(source="avg_rating", read_only=True)
+    review_amount = serializers.IntegerField(source="review_count", read_only=True)
+    rating_histogram = serializers.SerializerMethodField()
     housing_reviews = ReviewsSerializer(many=True, read_only=True)
 
     class Meta:
         model = Housing
         fields = ('id', 'name', 'description', 'address',
-                  'city', 'country', 'price', 'option', 'type', "owner_pfp", "owner_date_join",
-                  'owner', 'rating', "photos", "review_amount", "housing_reviews", "conveniences")
-
-    def get_rating(self, obj):
-        if obj.rating_amount == 0:
-            return 0
-
-        return round(obj.rating_amount / obj.rated_people, 2)
+                  'city', 'country', 'latitude', 'longitude', 'price', 'option', 'type', "owner_pfp", "owner_date_join",
+                  'owner', 'rating', "photos", "review_amount", "rating_histogram", "housing_reviews", "conveniences")
+        method_sources = {
+            "owner_pfp": ["owner__pfp"], "owner_date_join": ["owner__date_joined"],
+            "rating_histogram": [f"rating_{star}_count" for star in RATING_STARS],
+        }
 
     def get_owner_date_join(self, obj):
         return obj.owner.date_joined.strftime("%m/%d/%Y")
@@ -187,10 +262,13 @@ class HousingDetailsSerializer(serializers.ModelSerializer):
         else:
             return None
 
+    def get_rating_histogram(self, obj):
+        return obj.rating_histogram()
+
 
-class UserHousingsSerializer(serializers.ModelSerializer):
+class UserHousingsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     type = serializers.CharField(source="type.name")
-    wallpaper_photo = serializers.SerializerMethodField()
+    wallpaper_photo = serializers.CharField(source="wallpaper_url", read_only=True)
 
     class Meta:
         model = Housing
@@ -200,47 +278,35 @@ class UserHousingsSerializer(serializers.ModelSerializer):
             'price', 'option', 'type', "wallpaper_photo"
         ]
 
-    def get_wallpaper_photo(self, obj):
-        photos = getattr(obj, "wallpaper_photo", [])
-        if photos:
-            photo_instance = photos[0]
-            if photo_instance.photo and photo_instance.photo.name:
-                try:
-                    return photo_instance.photo.url
-                except ValueError:
-                    return None
-        return None
 
-
-class HousingBookSerializer(serializers.Serializer):
-    housing_id = serializers.IntegerField()
+class StayDatesSerializer(serializers.Serializer):
     check_in = serializers.DateField()
     check_out = serializers.DateField()
-    bill = serializers.DecimalField(max_digits=10, decimal_places=2)
 
+    def validate(self, attrs):
+        if attrs["check_out"] <= attrs["check_in"]:
+            raise serializers.ValidationError({"check_out": "Check-out must be after check-in."})
+        if (attrs["check_out"] - attrs["check_in"]).days > MAX_QUOTE_NIGHTS:
+            raise serializers.ValidationError({"check_out": f"Stays are limited to {MAX_QUOTE_NIGHTS} nights."})
+        return attrs
 
-class HousingBookDetailsSerializer(serializers.ModelSerializer):
-    rating = serializers.SerializerMethodField()
-    wallpaper = serializers.SerializerMethodField()
 
-    class Meta:
-        model = Housing
-        fields = ('id', 'name', 'address', "city", "country", "wallpaper", "rating")
+class HousingBookSerializer(StayDatesSerializer):
+    housing_id = serializers.IntegerField()
+    # Ignored: the bill is quoted on the server. Still accepted so existing clients keep validating.
+    bill = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
 
-    def get_rating(self, obj):
-        if obj.rating_amount == 0:
-            return 0
 
-        return round(obj.rating_amount / obj.rated_people, 2)
+class HousingBookDetailsSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    rating = serializers.FloatField(source="avg_rating", read_only=True)
+    wallpaper = serializers.CharField(source="wallpaper_url", read_only=True)
 
-    def get_wallpaper(self, obj):
-        wallpaper = getattr(obj, "wallpaper", None)
-        if wallpaper and wallpaper[0].photo:
-            return wallpaper[0].photo.url
-        return None
+    class Meta:
+        model = Housing
+        fields = ('id', 'name', 'address', "city", "country", "wallpaper", "rating")
 
 
-class UserBookingSerializer(serializers.ModelSerializer):
+class UserBookingSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     housing = HousingBookDetailsSerializer()
     booked_date = serializers.SerializerMethodField()
     date_status = serializers.SerializerMethodField()
@@ -248,13 +314,14 @@ class UserBookingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Booking
         fields = ["id", "check_out_date", "check_in_date", "guests_amount", "bill_to_pay", "housing", "booked_date", "date_status", "status"]
+        method_sources = {"booked_date": ["created_at"], "date_status": ["check_out_date"]}
+        row_methods = {"booked_date": format_booked_date, "date_status": is_upcoming}
 
     def get_booked_date(self, obj):
-        return obj.created_at.strftime("%m-%d-%Y")
+        return format_booked_date(obj.created_at)
 
     def get_date_status(self, obj):
-        current_time = date.today()
-        return obj.check_out_date > current_time
+        return is_upcoming(obj.check_out_date)
 
 
 class DeleteBookingSerializer(serializers.Serializer):
@@ -283,13 +350,11 @@ class MyHousingReservationSerializer(serializers.ModelSerializer):
                   "booked_date", "status", "date_status",
                   "housing", "first_name", "last_name", "email"
                   ]
+        method_sources = {"booked_date": ["created_at"], "date_status": ["check_out_date"]}
+        row_methods = {"booked_date": format_booked_date, "date_status": is_upcoming}
 
     def get_booked_date(self, obj):
-        return obj.created_at.strftime("%m-%d-%Y")
+        return format_booked_date(obj.created_at)
 
     def get_date_status(self, obj):
-        current_time = date.today()
-        if obj.check_out_date > current_time:
-            return True
-        else:
-            return False
+        return is_upcoming(obj.check_out_date)
@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import (
+    invalidate_tags, mark_housing_facets_dirty, mark_type_facets_dirty, housing_tag, user_tag, CATALOG_TAG,
+)
+from .models import Housing, Review, Booking, Favorites, HousingPhotos, TypeOfHousing
+
+
+def invalidate_on_commit(*tags):
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+@receiver([post_save, post_delete], sender=Housing)
+def invalidate_housing(sender, instance, signal, **kwargs):
+    tags = [housing_tag(instance.id), user_tag(instance.owner_id)]
+    # Housing.delete() bumps the catalog itself, but queryset and cascade deletes only send signals.
+    if signal is post_delete:
+        tags.append(CATALOG_TAG)
+        values = instance.get_tracked_values()
+        transaction.on_commit(lambda: mark_housing_facets_dirty(values))
+
+    invalidate_on_commit(*tags)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    invalidate_on_commit(housing_tag(instance.related_to_id))
+
+
+@receiver(post_delete, sender=Review)
+def forget_review_rating(sender, instance, **kwargs):
+    # Also runs for queryset deletes and for the cascade from a deleted listing or user.
+    Housing(pk=instance.related_to_id).forget_rating(instance.review_rating)
+
+
+@receiver([post_save, post_delete], sender=HousingPhotos)
+def invalidate_photo(sender, instance, **kwargs):
+    invalidate_on_commit(housing_tag(instance.housing_id))
+
+
+@receiver([post_save, post_delete], sender=Favorites)
+def invalidate_favorite(sender, instance, **kwargs):
+    invalidate_on_commit(user_tag(instance.favorites_owner_id))
+
+
+@receiver([post_save, post_delete], sender=Booking)
+def invalidate_booking(sender, instance, **kwargs):
+    # Both the guest's bookings and the host's reservations list it.
+    host_id = Housing.objects.filter(pk=instance.housing_id).values_list("owner_id", flat=True).first()
+    invalidate_on_commit(user_tag(instance.owner_id), user_tag(host_id))
+
+
+@receiver([post_save, post_delete], sender=TypeOfHousing)
+def invalidate_housing_type(sender, instance, created=False, **kwargs):
+    # Listing pages show the type's name.
+    invalidate_on_commit(CATALOG_TAG)
+
+    # The facet table groups by name: a rename moves the type's listings to a new slice, and a delete takes
+    # them away with the id the refresh would resolve the name from. A new type has no listings yet.
+    names = {getattr(instance, "_loaded_name", None), instance.name} - {None}
+    if not created:
+        transaction.on_commit(lambda: mark_type_facets_dirty(*names))
+    instance._loaded_name = instance.name
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no cached payload shows.
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+
+    tags = [user_tag(instance.id)]
+    # Listing pages show the host's username.
+    if (not update_fields or "username" in update_fields) and Housing.objects.filter(owner_id=instance.id).exists():
+        tags.append(CATALOG_TAG)
+
+    invalidate_on_commit(*tags)
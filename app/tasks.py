@@ -1,10 +1,21 @@
-from celery import shared_task
+from datetime import date
+
+from celery import group, shared_task
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 from django.core.mail import EmailMessage
 from django.template.loader import render_to_string
 
 from airbnb.settings import EMAIL_HOST_USER
-from .models import Booking
+from .cache import get_redis, invalidate_tags, reservations_tag, HOUSING_FACETS_DIRTY_KEY
+from .facets import rebuild_housing_facets, refresh_facet_slice, dirty_slices
+from .models import Booking, HousingFacet
+
+FACETS_LOCK_KEY = "housing_facets_lock"
+FACETS_DIRTY_BATCH = 500
+FINISH_BOOKINGS_BATCH = 500
+FINISHED_EMAILS_GROUP = 100
 
 
 @shared_task
@@ -55,4 +66,68 @@ def email_finished_notification(user_id: int, booking_id: int) -> bool:
         return True
     except Exception as e:
         print(e)
-        return False
\ No newline at end of file
+        return False
+
+
+@shared_task
+def refresh_housing_facets() -> int:
+    if not cache.add(FACETS_LOCK_KEY, True, 5 * 60):
+        return 0
+
+    try:
+        redis_client = get_redis()
+
+        if not HousingFacet.objects.exists():
+            redis_client.delete(HOUSING_FACETS_DIRTY_KEY)
+            rebuild_housing_facets()
+            return 0
+
+        slices = dirty_slices(redis_client.spop(HOUSING_FACETS_DIRTY_KEY, FACETS_DIRTY_BATCH) or [])
+        for dimension, value in slices:
+            refresh_facet_slice(dimension, value)
+
+        return len(slices)
+    finally:
+        cache.delete(FACETS_LOCK_KEY)
+
+
+def finish_bookings_chunk(today) -> int:
+    """Move one chunk of past stays to Finished in a single UPDATE; returns how many were moved."""
+    with transaction.atomic():
+        # SKIP LOCKED lets an overlapping run (or a host confirming by hand) work on other rows.
+        rows = list(
+            Booking.objects.select_for_update(skip_locked=True, of=("self",))
+            .filter(status="Booked", check_out_date__lt=today)
+            .order_by("id")
+            .values_list("id", "owner_id", "owner__username", "housing__owner_id")[:FINISH_BOOKINGS_BATCH]
+        )
+        if not rows:
+            return 0
+
+        # update() skips the per-row signals, so only the listings below are invalidated.
+        Booking.objects.filter(id__in=[booking_id for booking_id, *_ in rows]).update(status="Finished")
+
+        cache_keys = {f"user_bookings_{guest}" for _, _, guest, _ in rows}
+        tags = {reservations_tag(host_id) for *_, host_id in rows}
+        notifications = [
+            email_finished_notification.s(user_id=owner_id, booking_id=booking_id) for booking_id, owner_id, *_ in rows
+        ]
+
+        transaction.on_commit(lambda: cache.delete_many(cache_keys))
+        transaction.on_commit(lambda: invalidate_tags(*tags))
+        for start in range(0, len(notifications), FINISHED_EMAILS_GROUP):
+            batch = group(notifications[start:start + FINISHED_EMAILS_GROUP])
+            transaction.on_commit(batch.apply_async)
+
+    return len(rows)
+
+
+@shared_task
+def finish_past_bookings() -> int:
+    today = date.today()
+    finished = 0
+
+    while moved := finish_bookings_chunk(today):
+        finished += moved
+
+    return finished
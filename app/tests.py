@@ -1,9 +1,48 @@
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import gzip
+import json
+import random
+import threading
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+import brotli
+import msgpack
 import pytest
 from django.contrib.auth import get_user_model
-from .models import Housing, TypeOfHousing, Review, Booking, Favorites
+from django.core.cache import cache
+from django.db import connection
+from django.forms.utils import ErrorList
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+from .filters import HousingFilter
+from . import occupancy
+from .cache import get_redis, set_tagged, tag_set_key
+from .conditional import cache_payload, read_through
+from .flat import FlatSerializer
+from .middleware import CompressionMiddleware, choose_encoding
+from .renderers import FastJSONRenderer, MessagePackParser, MessagePackRenderer
+from .models import Housing, TypeOfHousing, Review, Booking, Favorites, HousingPhotos
+from .serializer import (
+    HousingSerializer, FavoritesListSerializer, UserBookingSerializer, MyHousingReservationSerializer,
+)
+from .tasks import finish_past_bookings, refresh_housing_facets
 
 User = get_user_model()
 
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
 @pytest.mark.django_db
 def test_create_type_of_housing():
     t = TypeOfHousing.objects.create(name="Apartment")
@@ -108,3 +147,1143 @@ def test_booking_model():
     )
     assert booking.owner == user
     assert booking.housing == housing
+
+@pytest.mark.django_db
+def test_housing_list_cursor_pagination():
+    user = User.objects.create_user(username="host", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Flat")
+    for i in range(3):
+        Housing.objects.create(
+            name=f"Flat {i}",
+            owner=user,
+            description="Flat",
+            address="Street",
+            city="Almaty",
+            country="Kazakhstan",
+            price=50,
+            option="Per day",
+            type=housing_type,
+            conveniences="WiFi",
+            status=True,
+        )
+
+    client = APIClient()
+    first = client.get("/api/v1/housing/list/", {"page_size": 2, "with_total": "true"}).json()
+    assert [h["name"] for h in first["results"]] == ["Flat 2", "Flat 1"]
+    assert "count" not in first
+    assert "estimated_total" in first
+
+    second = client.get(first["next"]).json()
+    assert [h["name"] for h in second["results"]] == ["Flat 0"]
+    assert second["next"] is None
+
+    legacy = client.get("/api/v1/housing/list/", {"page": 1}).json()
+    assert legacy["count"] == 3
+
+@pytest.mark.django_db
+def test_housing_list_search_relevance():
+    user = User.objects.create_user(username="searchhost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Loft")
+    for name, city, description in [
+        ("Sunny Loft", "Almaty", "Bright loft near the mountains"),
+        ("Quiet Room", "Astana", "A quiet room with a view of a sunny park"),
+        ("Dark Basement", "Almaty", "No windows"),
+    ]:
+        Housing.objects.create(
+            name=name,
+            owner=user,
+            description=description,
+            address="Street",
+            city=city,
+            country="Kazakhstan",
+            price=50,
+            option="Per day",
+            type=housing_type,
+            conveniences="WiFi",
+            status=True,
+        )
+
+    client = APIClient()
+    response = client.get("/api/v1/housing/list/", {"search": "sun", "ordering": "relevance"}).json()
+    assert [h["name"] for h in response["results"]] == ["Sunny Loft", "Quiet Room"]
+
+    response = client.get("/api/v1/housing/list/", {"city": "Almatty"}).json()
+    assert {h["name"] for h in response["results"]} == {"Sunny Loft", "Dark Basement"}
+
+@pytest.mark.django_db
+def test_wallpaper_is_denormalized_on_housing():
+    user = User.objects.create_user(username="photohost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Studio")
+    housing = Housing.objects.create(
+        name="Studio",
+        owner=user,
+        description="Small",
+        address="Street",
+        city="Almaty",
+        country="Kazakhstan",
+        price=30,
+        option="Per day",
+        type=housing_type,
+        conveniences="WiFi",
+    )
+    first = HousingPhotos.objects.create(housing=housing, photo=f"{housing.pk}/first.jpg", is_wallpaper=True)
+    HousingPhotos.objects.create(housing=housing, photo=f"{housing.pk}/second.jpg")
+
+    housing.sync_wallpaper(first)
+    assert housing.wallpaper_key == f"{housing.pk}/first.jpg"
+    assert housing.wallpaper_url.endswith(f"/housing/{housing.pk}/first.jpg")
+
+    first.photo = None  # keep the test away from the S3 bucket
+    first.delete()
+    housing.refresh_from_db()
+    assert housing.wallpaper_key == f"{housing.pk}/second.jpg"
+    assert HousingPhotos.objects.get(housing=housing).is_wallpaper
+
+HOT_TABLES = ("app_housing", "app_housingphotos", "app_review", "app_favorites", "app_booking")
+
+
+def seed_query_shapes():
+    host = User.objects.create_user(username="bighost", password="pass")
+    guest = User.objects.create_user(username="guest", password="pass")
+    others = User.objects.bulk_create([User(username=f"user{i}") for i in range(200)])
+    housing_type = TypeOfHousing.objects.create(name="Apartment")
+
+    housings = Housing.objects.bulk_create([
+        Housing(
+            name=f"Apartment {i}",
+            owner=host if i < 10 else others[i % len(others)],
+            description="Seeded",
+            address="Street",
+            city="Almaty",
+            country="Kazakhstan",
+            price=i % 500,
+            option="Per day",
+            type=housing_type,
+            conveniences="WiFi",
+            status=i % 10 != 0,
+        ) for i in range(5000)
+    ])
+    HousingPhotos.objects.bulk_create([
+        HousingPhotos(housing=housing, photo=f"{housing.pk}/{n}.jpg", is_wallpaper=n == 0)
+        for housing in housings for n in range(2)
+    ])
+    Review.objects.bulk_create([
+        Review(review_owner=others[i % len(others)], review_text="Nice", review_rating=5,
+               related_to=housings[i % len(housings)])
+        for i in range(5000)
+    ])
+    Favorites.objects.bulk_create([
+        Favorites(favorites_owner=others[i % len(others)], favorites_housing=housings[i])
+        for i in range(5000)
+    ] + [Favorites(favorites_owner=guest, favorites_housing=housings[i]) for i in range(10, 20)])
+    Booking.objects.bulk_create([
+        Booking(owner=others[i % len(others)], housing=housings[i % len(housings)],
+                check_in_date=date(2025, 1, 1) + timedelta(days=i % 300),
+                check_out_date=date(2025, 1, 4) + timedelta(days=i % 300))
+        for i in range(5000)
+    ] + [Booking(owner=guest, housing=housings[i], check_in_date=date(2025, 6, 1), check_out_date=date(2025, 6, 5))
+         for i in range(5)])
+
+    with connection.cursor() as cursor:
+        for table in HOT_TABLES:
+            cursor.execute(f"ANALYZE {table}")
+
+    return host, guest, housings
+
+
+@pytest.mark.django_db
+def test_view_queries_use_indexes():
+    host, guest, housings = seed_query_shapes()
+
+    requests = [
+        (None, "/api/v1/housing/list/"),
+        (guest, "/api/v1/housing/list/"),
+        (guest, "/api/v1/favorites/"),
+        (None, f"/api/v1/review/list/?housing_id={housings[1].pk}"),
+        (None, f"/api/v1/housing/detail/{housings[1].pk}/"),
+        (guest, f"/api/v1/housing/user/{host.username}/"),
+        (guest, "/api/v1/booking/list/"),
+        (host, "/api/v1/booking/manage/"),
+    ]
+
+    with CaptureQueriesContext(connection) as captured:
+        for user, url in requests:
+            client = APIClient()
+            if user is not None:
+                client.force_authenticate(user)
+            assert client.get(url).status_code == 200, url
+
+        list(Housing.objects.filter(status=False).order_by("-created_at").select_related("owner", "type"))
+        Booking.objects.filter(housing=housings[1], check_in_date__lt=date(2025, 1, 10),
+                               check_out_date__gt=date(2025, 1, 5)).exists()
+
+    # With seq scans priced out the planner picks an index whenever one fits, so a scan on a hot
+    # table that is still sequential (or walks a whole index without a condition) has no index.
+    plans = {}
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        for query in captured.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or not any(table in sql for table in HOT_TABLES):
+                continue
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+            plans[sql] = cursor.fetchone()[0][0]["Plan"]
+
+    assert plans
+    for sql, plan in plans.items():
+        assert not unindexed_scans(plan), f"{sql}\n{unindexed_scans(plan)}"
+
+
+def unindexed_scans(node):
+    found = []
+    if node.get("Relation Name") in HOT_TABLES:
+        if node["Node Type"] == "Seq Scan" or (
+            node["Node Type"] in ("Index Scan", "Index Only Scan") and "Index Cond" not in node
+        ):
+            found.append(f'{node["Node Type"]} on {node["Relation Name"]}')
+
+    for child in node.get("Plans", []):
+        found.extend(unindexed_scans(child))
+
+    return found
+
+
+@pytest.mark.django_db
+def test_anonymous_housing_list_is_cached_per_catalog_generation(django_capture_on_commit_callbacks):
+    user = User.objects.create_user(username="cachehost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Hostel")
+    with django_capture_on_commit_callbacks(execute=True):
+        housing = Housing.objects.create(
+            name="Hostel",
+            owner=user,
+            description="Bunks",
+            address="Street",
+            city="Almaty",
+            country="Kazakhstan",
+            price=10,
+            option="Per day",
+            type=housing_type,
+            conveniences="WiFi",
+        )
+
+    client = APIClient()
+    assert client.get("/api/v1/housing/list/").json()["results"] == []
+
+    Housing.objects.filter(pk=housing.pk).update(status=True)
+    assert client.get("/api/v1/housing/list/").json()["results"] == []
+
+    housing.refresh_from_db()
+    housing.price = 15
+    with django_capture_on_commit_callbacks(execute=True):
+        housing.save()
+    assert [h["price"] for h in client.get("/api/v1/housing/list/").json()["results"]] == [15]
+
+    housing.name = "Bunk House"
+    housing.city = "Astana"
+    with django_capture_on_commit_callbacks(execute=True):
+        housing.save()
+    listed = client.get("/api/v1/housing/list/").json()["results"]
+    assert [(h["name"], h["city"]) for h in listed] == [("Bunk House", "Astana")]
+
+    user.username = "renamedhost"
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    assert [h["owner_username"] for h in client.get("/api/v1/housing/list/").json()["results"]] == ["renamedhost"]
+
+
+@pytest.mark.django_db
+def test_authenticated_housing_list_reuses_shared_page():
+    host = User.objects.create_user(username="overlayhost", password="pass")
+    guest = User.objects.create_user(username="overlayguest", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Chalet")
+    housings = [
+        Housing.objects.create(
+            name=f"Chalet {i}",
+            owner=guest if i == 0 else host,
+            description="Snow",
+            address="Street",
+            city="Almaty",
+            country="Kazakhstan",
+            price=70,
+            option="Per day",
+            type=housing_type,
+            conveniences="Fireplace",
+            status=True,
+        ) for i in range(3)
+    ]
+    Favorites.objects.create(favorites_owner=guest, favorites_housing=housings[1])
+    # The guest's own listing is the newest, so it would land on their first page.
+    Housing.objects.filter(pk=housings[0].pk).update(created_at=datetime.now(timezone.utc))
+
+    anonymous = APIClient().get("/api/v1/housing/list/").json()
+    assert len(anonymous["results"]) == 3
+
+    client = APIClient()
+    client.force_authenticate(guest)
+    results = client.get("/api/v1/housing/list/").json()["results"]
+    assert {h["name"]: h["is_favorite"] for h in results} == {"Chalet 1": True, "Chalet 2": False}
+
+    # The guest hosts Chalet 0, which is left out before paginating, so their pages stay full.
+    first = client.get("/api/v1/housing/list/", {"page_size": 2}).json()
+    assert [h["name"] for h in first["results"]] == ["Chalet 2", "Chalet 1"] and first["next"] is None
+
+    # Users without listings are served the anonymous page plus their overlay, without touching listings.
+    visitor = User.objects.create_user(username="overlayvisitor", password="pass")
+    Favorites.objects.create(favorites_owner=visitor, favorites_housing=housings[0])
+    client.force_authenticate(visitor)
+    client.get("/api/v1/housing/list/")
+    with CaptureQueriesContext(connection) as captured:
+        results = client.get("/api/v1/housing/list/").json()["results"]
+
+    assert [h["is_favorite"] for h in results] == [True, False, False]
+    assert not any("app_housing" in query["sql"] for query in captured.captured_queries)
+
+
+@pytest.mark.django_db
+def test_housing_list_availability_filter():
+    host = User.objects.create_user(username="availhost", password="pass")
+    guest = User.objects.create_user(username="availguest", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Yurt")
+    booked, free = [
+        Housing.objects.create(
+            name=name,
+            owner=host,
+            description="Steppe",
+            address="Street",
+            city="Almaty",
+            country="Kazakhstan",
+            price=20,
+            option="Per day",
+            type=housing_type,
+            conveniences="Stove",
+            status=True,
+        ) for name in ("Booked Yurt", "Free Yurt")
+    ]
+    Booking.objects.create(owner=guest, housing=booked, check_in_date="2025-07-10", check_out_date="2025-07-15")
+
+    client = APIClient()
+    overlapping = client.get("/api/v1/housing/list/", {"check_in": "2025-07-14", "check_out": "2025-07-20"}).json()
+    assert [h["name"] for h in overlapping["results"]] == ["Free Yurt"]
+
+    after_checkout = client.get("/api/v1/housing/list/", {"check_in": "2025-07-15", "check_out": "2025-07-20"}).json()
+    assert [h["name"] for h in after_checkout["results"]] == ["Free Yurt", "Booked Yurt"]
+
+    reversed_range = client.get("/api/v1/housing/list/", {"check_in": "2025-07-20", "check_out": "2025-07-10"})
+    assert reversed_range.status_code == 400
+    assert client.get("/api/v1/housing/list/", {"check_in": "2025-07-14"}).status_code == 400
+    assert client.get("/api/v1/housing/list/", {"check_out": "2025-07-14", "pagination": "page"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_housing_list_geo_filters():
+    host = User.objects.create_user(username="geohost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Guesthouse")
+    for name, lat, lng in [
+        ("Center", 43.2389, 76.8897),
+        ("Medeu", 43.1575, 77.0590),
+        ("Astana", 51.1694, 71.4491),
+        ("Suva", -18.1416, 178.4419),
+        ("Taveuni", -16.8500, -179.9700),
+    ]:
+        Housing.objects.create(
+            name=name,
+            owner=host,
+            description="Guesthouse",
+            address="Street",
+            city="Almaty",
+            country="Kazakhstan",
+            price=40,
+            option="Per day",
+            type=housing_type,
+            conveniences="WiFi",
+            status=True,
+            latitude=lat,
+            longitude=lng,
+        )
+
+    client = APIClient()
+    near = client.get("/api/v1/housing/list/", {"near": "43.2500,76.9000", "radius": 25}).json()["results"]
+    assert [h["name"] for h in near] == ["Center", "Medeu"]
+    assert near[0]["distance_km"] < near[1]["distance_km"] < 25
+
+    bbox = client.get("/api/v1/housing/list/", {"bbox": "70,50,73,52"}).json()["results"]
+    assert [h["name"] for h in bbox] == ["Astana"]
+
+    assert client.get("/api/v1/housing/list/", {"near": "43.25"}).status_code == 400
+
+    # Across the antimeridian, both as a radius and as a bbox with min_lng > max_lng.
+    fiji = client.get("/api/v1/housing/list/", {"near": "-18.1416,178.4419", "radius": 300}).json()["results"]
+    assert [h["name"] for h in fiji] == ["Suva", "Taveuni"]
+    fiji = client.get("/api/v1/housing/list/", {"bbox": "178,-20,-179,-15"}).json()["results"]
+    assert {h["name"] for h in fiji} == {"Suva", "Taveuni"}
+
+    assert client.get("/api/v1/housing/list/", {"bbox": "70,52,73,50"}).status_code == 400
+    assert client.get("/api/v1/housing/list/", {"radius": 25}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_housing_facets_match_live_counts(django_capture_on_commit_callbacks):
+    host = User.objects.create_user(username="facethost", password="pass")
+    villa = TypeOfHousing.objects.create(name="Villa")
+    flat = TypeOfHousing.objects.create(name="Flat")
+    with django_capture_on_commit_callbacks(execute=True):
+        for name, housing_type, city, price in [
+            ("A", villa, "Almaty", 40), ("B", villa, "Astana", 150), ("C", flat, "Almaty", 60), ("D", flat, "Almaty", 700),
+        ]:
+            Housing.objects.create(
+                name=name, owner=host, description="Facet", address="Street", city=city, country="Kazakhstan",
+                price=price, option="Per day", type=housing_type, conveniences="WiFi", status=True,
+            )
+
+    refresh_housing_facets()
+
+    client = APIClient()
+    overall = client.get("/api/v1/housing/facets/").json()
+    assert overall["type"] == [{"value": "Flat", "count": 2}, {"value": "Villa", "count": 2}]
+    assert overall["city"] == [{"value": "Almaty", "count": 3}, {"value": "Astana", "count": 1}]
+    assert {row["value"] for row in overall["price"]} == {"0-50", "50-100", "100-200", "500+"}
+
+    villas = client.get("/api/v1/housing/facets/", {"type": "Villa"}).json()
+    assert villas["city"] == [{"value": "Almaty", "count": 1}, {"value": "Astana", "count": 1}]
+
+    housing = Housing.objects.get(name="C")
+    housing.type = villa
+    with django_capture_on_commit_callbacks(execute=True):
+        housing.save()
+    assert refresh_housing_facets() > 0
+
+    for params in ({}, {"type": "Villa"}, {"type": "Flat"}, {"country": "Kazakhstan"}):
+        stored = client.get("/api/v1/housing/facets/", params).json()
+        live = client.get("/api/v1/housing/facets/", {**params, "price_min": 0}).json()
+        for dimension, rows in stored.items():
+            if dimension not in params:
+                assert rows == live[dimension], (params, dimension)
+
+
+@pytest.mark.django_db
+def test_housing_facets_follow_type_renames_and_bulk_deletes(django_capture_on_commit_callbacks):
+    hosts = [User.objects.create_user(username=f"bulkhost{index}", password="pass") for index in range(2)]
+    villa = TypeOfHousing.objects.create(name="Villa")
+    with django_capture_on_commit_callbacks(execute=True):
+        for host, city in [(hosts[0], "Almaty"), (hosts[0], "Astana"), (hosts[1], "Shymkent"), (hosts[1], "Almaty")]:
+            Housing.objects.create(
+                name=city, owner=host, description="Facet", address="Street", city=city, country="Kazakhstan",
+                price=80, option="Per day", type=villa, conveniences="WiFi", status=True,
+            )
+    refresh_housing_facets()
+    client = APIClient()
+
+    villa = TypeOfHousing.objects.get(pk=villa.pk)
+    villa.name = "Chalet"
+    with django_capture_on_commit_callbacks(execute=True):
+        villa.save()
+    refresh_housing_facets()
+
+    assert client.get("/api/v1/housing/facets/").json()["type"] == [{"value": "Chalet", "count": 4}]
+    assert client.get("/api/v1/housing/facets/", {"type": "Chalet"}).json()["city"][0] == {"value": "Almaty", "count": 2}
+
+    # A queryset delete, then a cascade from the owner: neither goes through Housing.delete().
+    with django_capture_on_commit_callbacks(execute=True):
+        Housing.objects.filter(city="Astana").delete()
+        hosts[1].delete()
+    refresh_housing_facets()
+
+    overall = client.get("/api/v1/housing/facets/").json()
+    assert overall["type"] == [{"value": "Chalet", "count": 1}]
+    assert overall["city"] == [{"value": "Almaty", "count": 1}]
+
+
+@pytest.mark.django_db
+def test_housing_facets_reject_invalid_filters_like_the_listing():
+    client = APIClient()
+    params = {"price_min": "cheap", "check_in": "soon"}
+
+    facets = client.get("/api/v1/housing/facets/", params)
+    listing = client.get("/api/v1/housing/list/", params)
+
+    assert facets.status_code == listing.status_code == 400
+    assert facets.json() == listing.json()
+
+
+@pytest.mark.django_db
+def test_housing_list_rating_order_and_filter():
+    host = User.objects.create_user(username="ratinghost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Bungalow")
+    for name, rated_people, rating_amount in [("Unrated", 0, 0), ("Good", 3, 13), ("Great", 2, 10)]:
+        Housing.objects.create(
+            name=name, owner=host, description="Beach", address="Street", city="Aktau", country="Kazakhstan",
+            price=90, option="Per day", type=housing_type, conveniences="Sea", status=True,
+            rated_people=rated_people, rating_amount=rating_amount,
+        )
+
+    client = APIClient()
+    ordered = client.get("/api/v1/housing/list/", {"ordering": "rating"}).json()["results"]
+    assert [(h["name"], h["rating"]) for h in ordered] == [("Great", 5.0), ("Good", 4.33), ("Unrated", 0.0)]
+
+    filtered = client.get("/api/v1/housing/list/", {"rating_min": 4.5}).json()["results"]
+    assert [h["name"] for h in filtered] == ["Great"]
+
+
+@pytest.mark.django_db
+def test_sparse_fieldsets_trim_payload_and_query():
+    host = User.objects.create_user(username="sparsehost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Chalet")
+    housing = Housing.objects.create(
+        name="Snowy Chalet", owner=host, description="Ski in, ski out", address="Slope 1", city="Shymbulak",
+        country="Kazakhstan", price=150, option="Per day", type=housing_type, conveniences="Sauna", status=True,
+    )
+
+    client = APIClient()
+    with CaptureQueriesContext(connection) as queries:
+        listed = client.get("/api/v1/housing/list/", {"fields": "name,price"}).json()["results"]
+    assert listed == [{"id": housing.id, "name": "Snowy Chalet", "price": 150}]
+    assert "description" not in queries.captured_queries[0]["sql"]
+
+    full = client.get(f"/api/v1/housing/detail/{housing.id}/").json()
+    assert "photos" in full and "housing_reviews" in full
+
+    trimmed = client.get(f"/api/v1/housing/detail/{housing.id}/", {"omit": "photos,housing_reviews,description"}).json()
+    assert set(trimmed) == set(full) - {"photos", "housing_reviews", "description"}
+
+    # A trimmed miss warms the full entry, and answers with the same ETag as the trimmed hit that follows.
+    cache.clear()
+    cold = client.get(f"/api/v1/housing/detail/{housing.id}/", {"fields": "name,city"})
+    assert cold.json() == {"id": housing.id, "name": "Snowy Chalet", "city": "Shymbulak"}
+    assert cache.get(f"housing_{housing.id}")["data"] == full
+
+    with CaptureQueriesContext(connection) as queries:
+        warm = client.get(f"/api/v1/housing/detail/{housing.id}/", {"fields": "city,name"})
+    assert not queries.captured_queries
+    assert warm["ETag"] == cold["ETag"] and warm.json() == cold.json()
+
+
+@pytest.mark.django_db
+def test_flat_serializer_matches_model_serializer():
+    host = User.objects.create_user(username="flathost", password="pass", first_name="Aida", email="aida@example.com")
+    guest = User.objects.create_user(username="flatguest", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Yurt")
+    for index in range(3):
+        housing = Housing.objects.create(
+            name=f"Yurt {index}", owner=host, description="Steppe", address="Road", city="Almaty", country="Kazakhstan",
+            price=40 + index, option="Per day", type=housing_type, conveniences="Stove", status=True,
+            rated_people=index, rating_amount=4 * index, latitude=43.2 + index / 100, longitude=76.9,
+            wallpaper_url="https://cdn.example.com/yurt.webp" if index else None,
+        )
+        Favorites.objects.create(favorites_owner=guest, favorites_housing=housing)
+        Booking.objects.create(
+            owner=guest, housing=housing, check_in_date=date.today() - timedelta(days=5 * index),
+            check_out_date=date.today() + timedelta(days=2 - 2 * index), guests_amount=2,
+            bill_to_pay="123.40" if index else None,
+        )
+
+    render = JSONRenderer().render
+    housings = Housing.objects.order_by("-created_at", "-id")
+    near = HousingFilter({"near": "43.2,76.9", "radius": "50"}, queryset=housings).qs
+    bookings = Booking.objects.order_by("id")
+
+    for serializer_class, kwargs, queryset in [
+        (HousingSerializer, {}, housings),
+        (HousingSerializer, {}, near),
+        (HousingSerializer, {"fields": {"name"}}, housings),
+        (FavoritesListSerializer, {}, Favorites.objects.order_by("id")),
+        (UserBookingSerializer, {}, bookings),
+        (MyHousingReservationSerializer, {}, bookings),
+    ]:
+        expected = serializer_class(queryset, many=True, **kwargs).data
+        flat = FlatSerializer(serializer_class(**kwargs), queryset).serialize()
+        assert render(flat) == render(expected), serializer_class.__name__
+
+
+def test_fast_json_renderer_matches_drf():
+    payload = {
+        "bill_to_pay": Decimal("123.40"),
+        "check_in_date": date(2025, 3, 2),
+        "created_at": datetime(2025, 3, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        "message": gettext_lazy("Housing not found."),
+        "text": "Уютная юрта \u2028 ☀",
+        "results": [{"id": 1, "rating": 4.33, "photos": (), "latitude": None}],
+        7: True,
+        **CONTAINER_SUBCLASSES,
+    }
+
+    assert FastJSONRenderer().render(payload) == JSONRenderer().render(payload)
+
+
+# Containers DRF and Django hand to renderers; ErrorList keeps its items outside the list it subclasses.
+CONTAINER_SUBCLASSES = {
+    "errors": {"status": ErrorList(["Select a valid choice."]), "detail": [ErrorDetail("Invalid", code="invalid")]},
+    "page": ReturnList([ReturnDict({"id": 1, "name": "Loft"}, serializer=None)], serializer=None),
+}
+
+
+def test_msgpack_round_trips_container_subclasses():
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(MessagePackRenderer().render(CONTAINER_SUBCLASSES))
+
+    assert list(unpacker) == [json.loads(JSONRenderer().render(CONTAINER_SUBCLASSES))]
+
+
+@pytest.mark.django_db
+def test_msgpack_is_negotiated_and_parsed():
+    host = User.objects.create_user(username="packhost", password="pass")
+    Housing.objects.create(
+        name="Packed Loft", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=70, option="Per day", type=TypeOfHousing.objects.create(name="Loft"), conveniences="WiFi", status=True,
+    )
+
+    client = APIClient()
+    as_json = client.get("/api/v1/housing/list/").json()
+    as_msgpack = client.get("/api/v1/housing/list/", HTTP_ACCEPT="application/msgpack")
+
+    assert as_msgpack["Content-Type"] == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.content) == as_json
+
+    body = msgpack.packb({"housing_id": 1, "rating": 4.5, "text": "Great"})
+    assert MessagePackParser().parse(BytesIO(body)) == {"housing_id": 1, "rating": 4.5, "text": "Great"}
+
+
+@pytest.mark.django_db
+def test_conditional_get_answers_304_without_queries():
+    host = User.objects.create_user(username="etaghost", password="pass")
+    housing = Housing.objects.create(
+        name="Tagged House", owner=host, description="Hills", address="Street", city="Almaty", country="Kazakhstan",
+        price=80, option="Per day", type=TypeOfHousing.objects.create(name="House"), conveniences="WiFi", status=True,
+    )
+    Review.objects.create(review_owner=host, review_text="Lovely", review_rating=5, related_to=housing)
+
+    client = APIClient()
+    for url, params in [
+        (f"/api/v1/housing/detail/{housing.id}/", {}),
+        (f"/api/v1/housing/detail/{housing.id}/", {"fields": "name"}),
+        ("/api/v1/review/list/", {"housing_id": housing.id}),
+    ]:
+        first = client.get(url, params)
+        etag = first["ETag"]
+        assert first.status_code == 200 and etag.startswith('"')
+
+        with CaptureQueriesContext(connection) as queries:
+            repeated = client.get(url, params, HTTP_IF_NONE_MATCH=etag)
+        assert repeated.status_code == 304 and repeated.content == b""
+        assert len(queries.captured_queries) == 0
+
+        assert client.get(url, params, HTTP_IF_NONE_MATCH='"stale"').status_code == 200
+        assert client.get(url, params, HTTP_ACCEPT="application/msgpack")["ETag"] != etag
+
+    full = client.get(f"/api/v1/housing/detail/{housing.id}/")["ETag"]
+    assert client.get(f"/api/v1/housing/detail/{housing.id}/", {"fields": "name"})["ETag"] != full
+
+
+def test_compression_middleware_negotiates_and_skips():
+    assert choose_encoding("gzip, deflate, br, zstd") == "zstd"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+    assert choose_encoding("*;q=0.1, zstd;q=0") == "br"
+    assert choose_encoding("identity") is None
+
+    body = b'{"review_text": "Great stay, quiet street."}' * 100
+    responses = {
+        "large": HttpResponse(body, content_type="application/json"),
+        "small": HttpResponse(b'{"id": 1}', content_type="application/json"),
+        "image": HttpResponse(body, content_type="image/webp"),
+        "stream": StreamingHttpResponse(iter([body[:1000], body[1000:]]), content_type="application/json"),
+    }
+    responses["large"]["ETag"] = '"abc"'
+
+    request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING="gzip")
+    for name, response in responses.items():
+        compressed = CompressionMiddleware(lambda _: response)(request)
+        if name in ("small", "image"):
+            assert not compressed.has_header("Content-Encoding"), name
+        else:
+            assert compressed["Content-Encoding"] == "gzip" and "Accept-Encoding" in compressed["Vary"]
+            content = b"".join(compressed.streaming_content) if compressed.streaming else compressed.content
+            assert gzip.decompress(content) == body
+
+    assert responses["large"]["ETag"] == 'W/"abc"'
+
+
+@pytest.mark.django_db
+def test_review_list_is_compressed_on_the_wire():
+    host = User.objects.create_user(username="gziphost", password="pass")
+    housing = Housing.objects.create(
+        name="Chatty House", owner=host, description="Hills", address="Street", city="Almaty", country="Kazakhstan",
+        price=80, option="Per day", type=TypeOfHousing.objects.create(name="House"), conveniences="WiFi", status=True,
+    )
+    Review.objects.bulk_create(
+        Review(review_owner=host, review_text="Clean, quiet and close to the mountains.", review_rating=5,
+               related_to=housing)
+        for _ in range(50)
+    )
+
+    client = APIClient()
+    plain = client.get("/api/v1/review/list/", {"housing_id": housing.id})
+    packed = client.get("/api/v1/review/list/", {"housing_id": housing.id}, HTTP_ACCEPT_ENCODING="br")
+
+    assert packed["Content-Encoding"] == "br"
+    assert brotli.decompress(packed.content) == plain.content
+    assert len(packed.content) < len(plain.content) / 5
+
+    repeated = client.get(
+        "/api/v1/review/list/", {"housing_id": housing.id}, HTTP_ACCEPT_ENCODING="br", HTTP_IF_NONE_MATCH=packed["ETag"],
+    )
+    assert repeated.status_code == 304
+
+
+def test_read_through_rebuilds_once_under_concurrency():
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.3)
+        return {"name": "Viral Villa"}, ["housing:1"]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(read_through("housing_viral", build, 60)))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len(results) == 20 and all(entry["data"] == {"name": "Viral Villa"} for entry in results)
+
+    # An entry that took long to build and is about to expire gets refreshed ahead of time.
+    cache_payload("housing_viral", {"name": "Old Villa"}, 60, delta=10 ** 9)
+    assert read_through("housing_viral", build, 60)["data"] == {"name": "Viral Villa"}
+    assert len(builds) == 2
+
+
+def test_tag_sets_drop_members_whose_entries_are_gone():
+    tag_key = tag_set_key("housing:prune")
+    get_redis().delete(tag_key)
+
+    for index in range(200):
+        set_tagged(f"prune_old_{index}", index, 60, ["housing:prune"])
+    cache.delete_many([f"prune_old_{index}" for index in range(200)])
+    for index in range(50):
+        set_tagged(f"prune_new_{index}", index, 60, ["housing:prune"])
+
+    members = get_redis().smembers(tag_key)
+    assert {cache.make_key(f"prune_new_{index}").encode() for index in range(50)} <= members
+    assert len(members) < 100
+
+
+@pytest.mark.django_db
+def test_writes_invalidate_tagged_cache_entries(django_capture_on_commit_callbacks):
+    host = User.objects.create_user(username="taghost", password="pass")
+    guest = User.objects.create_user(username="tagguest", password="pass")
+    housing = Housing.objects.create(
+        name="Tagged Flat", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=60, option="Per day", type=TypeOfHousing.objects.create(name="Flat"), conveniences="WiFi", status=True,
+    )
+    Booking.objects.create(
+        owner=guest, housing=housing, check_in_date=date(2025, 1, 1), check_out_date=date(2025, 1, 3), status="Finished",
+    )
+
+    client = APIClient()
+    client.force_authenticate(guest)
+    assert client.get(f"/api/v1/housing/detail/{housing.id}/").json()["review_amount"] == 0
+    assert client.get("/api/v1/booking/list/").json()[0]["status"] == "Finished"
+    client.get(f"/api/v1/housing/user/{host.username}/")
+    assert cache.get(f"housing_{housing.id}") and cache.get("user_bookings_tagguest") and cache.get("housings_taghost")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post("/api/v1/review/add/", {"housing_id": housing.id, "rating": 5, "text": "Great"})
+    assert response.status_code == 201
+
+    assert cache.get(f"housing_{housing.id}") is None
+    assert cache.get("user_bookings_tagguest") is None
+    assert cache.get("housings_taghost") is None
+    assert client.get(f"/api/v1/housing/detail/{housing.id}/").json()["review_amount"] == 1
+    assert client.get("/api/v1/booking/list/").json()[0]["status"] == "Reviewed"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        host.first_name = "Aigerim"
+        host.save()
+    assert cache.get(f"housing_{housing.id}") is None
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_ratings_are_all_counted():
+    host = User.objects.create_user(username="ratinghost", password="pass")
+    housing = Housing.objects.create(
+        name="Rated Flat", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=60, option="Per day", type=TypeOfHousing.objects.create(name="Flat"), conveniences="WiFi", status=True,
+    )
+    ratings = [1, 2, 3, 4, 5, 5, 5, 4] * 5
+
+    def rate(rating):
+        Housing.objects.get(pk=housing.pk).record_rating(rating)
+        connection.close()
+
+    threads = [threading.Thread(target=rate, args=(rating,)) for rating in ratings]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    housing.refresh_from_db()
+    assert (housing.rated_people, housing.rating_amount, housing.review_count) == (40, sum(ratings), 40)
+    assert housing.rating_histogram() == {"1": 5, "2": 5, "3": 5, "4": 10, "5": 15}
+
+    with CaptureQueriesContext(connection) as queries:
+        detail = APIClient().get(f"/api/v1/housing/detail/{housing.id}/").json()
+    assert detail["review_amount"] == 40 and detail["rating_histogram"] == housing.rating_histogram()
+    assert not any("COUNT(" in query["sql"] for query in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_deleted_reviews_leave_the_rating_totals():
+    host = User.objects.create_user(username="unratedhost", password="pass")
+    guest = User.objects.create_user(username="unratedguest", password="pass")
+    housing = Housing.objects.create(
+        name="Unrated Flat", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=60, option="Per day", type=TypeOfHousing.objects.create(name="Flat"), conveniences="WiFi", status=True,
+    )
+    for rating in (5, 4, 2):
+        Review.objects.create(review_owner=guest, review_text="Stay", review_rating=rating, related_to=housing)
+        housing.record_rating(rating)
+
+    Review.objects.get(review_rating=4).delete()
+    Review.objects.filter(review_rating=2).delete()
+
+    housing.refresh_from_db()
+    assert (housing.rated_people, housing.rating_amount, housing.review_count) == (1, 5, 1)
+    assert housing.rating_histogram() == {"1": 0, "2": 0, "3": 0, "4": 0, "5": 1}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_bookings_never_overlap(monkeypatch):
+    monkeypatch.setattr("app.views.book_notification_email.delay", lambda **kwargs: None)
+    host = User.objects.create_user(username="busyhost", password="pass")
+    housing = Housing.objects.create(
+        name="Busy Flat", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=60, option="Per day", type=TypeOfHousing.objects.create(name="Flat"), conveniences="WiFi", status=True,
+    )
+    guests = [User.objects.create(username=f"busyguest{index}") for index in range(20)]
+
+    rnd = random.Random(21)
+    attempts = [(rnd.randrange(40), rnd.randint(1, 5)) for _ in range(250)] + [(10, 3)] * 50
+    rnd.shuffle(attempts)
+    workers = 20
+    barrier = threading.Barrier(workers)
+    responses = []
+
+    def book(chunk, guest):
+        client = APIClient()
+        client.force_authenticate(guest)
+        barrier.wait()
+        for start, nights in chunk:
+            check_in = date(2025, 6, 1) + timedelta(days=start)
+            responses.append(client.post("/api/v1/booking/book/", {
+                "housing_id": housing.id, "check_in": check_in, "check_out": check_in + timedelta(days=nights),
+                "bill": "100.00",
+            }).status_code)
+        connection.close()
+
+    threads = [
+        threading.Thread(target=book, args=(attempts[index::workers], guests[index])) for index in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stays = sorted(Booking.objects.filter(housing=housing).values_list("check_in_date", "check_out_date"))
+    assert len(responses) == 300 and set(responses) == {200, 400}
+    assert responses.count(200) == len(stays)
+    assert all(previous[1] <= following[0] for previous, following in zip(stays, stays[1:]))
+
+
+@pytest.mark.django_db
+def test_calendar_reads_bitmap_patched_by_booking_writes(monkeypatch, django_capture_on_commit_callbacks):
+    monkeypatch.setattr("app.views.book_notification_email.delay", lambda **kwargs: None)
+    host = User.objects.create_user(username="calendarhost", password="pass")
+    guest = User.objects.create_user(username="calendarguest", password="pass")
+    housing = Housing.objects.create(
+        name="Calendar Flat", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=60, option="Per day", type=TypeOfHousing.objects.create(name="Flat"), conveniences="WiFi", status=True,
+    )
+    Booking.objects.create(owner=guest, housing=housing, check_in_date=date(2025, 6, 29), check_out_date=date(2025, 7, 2))
+    get_redis().delete(f"occupancy:{housing.id}")
+
+    client = APIClient()
+    client.force_authenticate(guest)
+    calendar = client.get(f"/api/v1/housing/calendar/{housing.id}/", {"start": "2025-06", "months": 2}).json()
+    assert calendar["months"] == [{"month": "2025-06", "booked": [29, 30]}, {"month": "2025-07", "booked": [1]}]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post("/api/v1/booking/book/", {
+            "housing_id": housing.id, "check_in": "2025-07-10", "check_out": "2025-07-12", "bill": "120.00",
+        })
+    assert response.status_code == 200
+
+    with CaptureQueriesContext(connection) as queries:
+        calendar = client.get(f"/api/v1/housing/calendar/{housing.id}/", {"start": "2025-07"}).json()
+    assert calendar["months"] == [{"month": "2025-07", "booked": [1, 10, 11]}]
+    assert not queries.captured_queries
+
+    booking = Booking.objects.get(housing=housing, check_in_date=date(2025, 6, 29))
+    with django_capture_on_commit_callbacks(execute=True):
+        client.delete(f"/api/v1/booking/delete/{booking.id}/")
+    calendar = client.get(f"/api/v1/housing/calendar/{housing.id}/", {"start": "2025-06", "months": 2}).json()
+    assert calendar["months"] == [{"month": "2025-06", "booked": []}, {"month": "2025-07", "booked": [10, 11]}]
+
+    assert client.get(f"/api/v1/housing/calendar/{housing.id}/", {"months": 13}).status_code == 400
+    assert client.get(f"/api/v1/housing/calendar/{housing.id}/", {"start": "9999-12", "months": 2}).status_code == 400
+    assert client.get("/api/v1/housing/calendar/999999/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_occupancy_rebuild_racing_a_booking_is_not_stored(monkeypatch):
+    host = User.objects.create_user(username="racehost", password="pass")
+    guest = User.objects.create_user(username="raceguest", password="pass")
+    housing = Housing.objects.create(
+        name="Race Flat", owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+        price=60, option="Per day", type=TypeOfHousing.objects.create(name="Flat"), conveniences="WiFi", status=True,
+    )
+    get_redis().delete(f"occupancy:{housing.id}")
+
+    # A booking commits (and patches) after the rebuild has read the bookings, but before it stores the bitmap.
+    build_bitmap = occupancy.build_bitmap
+
+    def build_then_book(stays):
+        bitmap = build_bitmap(stays)
+        Booking.objects.create(
+            owner=guest, housing=housing, check_in_date=date(2025, 8, 1), check_out_date=date(2025, 8, 3),
+        )
+        occupancy.patch_occupancy(housing.id, date(2025, 8, 1), date(2025, 8, 3), True)
+        return bitmap
+
+    monkeypatch.setattr(occupancy, "build_bitmap", build_then_book)
+    occupancy.load_occupancy(housing.id)
+    monkeypatch.setattr(occupancy, "build_bitmap", build_bitmap)
+
+    assert get_redis().get(f"occupancy:{housing.id}") is None
+    calendar = APIClient().get(f"/api/v1/housing/calendar/{housing.id}/", {"start": "2025-08"}).json()
+    assert calendar["months"] == [{"month": "2025-08", "booked": [1, 2]}]
+
+
+@pytest.mark.django_db
+def test_finish_past_bookings_in_chunks(monkeypatch, django_capture_on_commit_callbacks):
+    sent = []
+    monkeypatch.setattr("app.tasks.FINISH_BOOKINGS_BATCH", 2)
+    monkeypatch.setattr("app.tasks.FINISHED_EMAILS_GROUP", 1)
+    monkeypatch.setattr("app.tasks.group", lambda tasks: SimpleNamespace(apply_async=lambda: sent.append(tasks)))
+    host = User.objects.create_user(username="lifecyclehost", password="pass")
+    guests = [User.objects.create_user(username=f"lifecycleguest{index}", password="pass") for index in range(4)]
+    housing_type = TypeOfHousing.objects.create(name="Flat")
+    housing = Housing.objects.create(
+        name="Lifecycle Flat", owner=host, description="Center", address="Street", city="Almaty",
+        country="Kazakhstan", price=60, option="Per day", type=housing_type, conveniences="WiFi", status=True,
+    )
+    past = date.today() - timedelta(days=30)
+    for index, guest in enumerate(guests[:3]):
+        start = past + timedelta(days=index * 5)
+        Booking.objects.create(owner=guest, housing=housing, check_in_date=start, check_out_date=start + timedelta(days=2))
+    upcoming = Booking.objects.create(
+        owner=guests[3], housing=housing, check_in_date=date.today(), check_out_date=date.today() + timedelta(days=3),
+    )
+    for key in ("user_bookings_lifecycleguest0", "user_bookings_lifecycleguest3", "housings_lifecyclehost"):
+        cache.set(key, ["cached"], 60)
+    client = APIClient()
+    client.force_authenticate(host)
+    assert {booking["status"] for booking in client.get("/api/v1/booking/manage/").json()["results"]} == {"Booked"}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        assert finish_past_bookings() == 3
+
+    assert set(Booking.objects.exclude(pk=upcoming.pk).values_list("status", flat=True)) == {"Finished"}
+    assert Booking.objects.get(pk=upcoming.pk).status == "Booked"
+    assert len(sent) == 3 and all(len(tasks) == 1 for tasks in sent)
+    assert cache.get("user_bookings_lifecycleguest0") is None
+    reservations = client.get("/api/v1/booking/manage/").json()["results"]
+    assert [booking["status"] for booking in reservations] == ["Booked", "Finished", "Finished", "Finished"]
+    assert cache.get("user_bookings_lifecycleguest3") == ["cached"]
+    assert cache.get("housings_lifecyclehost") == ["cached"]
+
+
+@pytest.mark.django_db
+def test_price_quotes_apply_rates_and_follow_price_edits(settings, monkeypatch, django_capture_on_commit_callbacks):
+    settings.PRICE_WEEKEND_RATE = "1.5"
+    settings.PRICE_SEASONAL_RATES = [("12-30", "01-01", 2)]
+    monkeypatch.setattr("app.views.book_notification_email.delay", lambda **kwargs: None)
+    host = User.objects.create_user(username="quotehost", password="pass")
+    guest = User.objects.create_user(username="quoteguest", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Flat")
+    daily, weekly = (
+        Housing.objects.create(
+            name=name, owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+            price=price, option=option, type=housing_type, conveniences="WiFi", status=True,
+        )
+        for name, price, option in (("Daily", 100, "Per day"), ("Weekly", 700, "Per week"))
+    )
+
+    client = APIClient()
+    # Thu 2025-12-25 .. Tue 2025-12-30: Fri and Sat nights at 1.5, the 29th is a plain Monday, nothing in season.
+    dates = {"check_in": "2025-12-25", "check_out": "2025-12-30"}
+    quotes = client.get("/api/v1/housing/quote/", {"ids": f"{daily.id},{weekly.id},999999", **dates}).json()
+    assert quotes["nights"] == 5 and quotes["not_found"] == [999999]
+    assert [(item["nightly_rate"], item["total"]) for item in quotes["results"]] == [
+        ("100.00", "600.00"), ("100.00", "600.00"),
+    ]
+
+    # Wed 2025-12-31 and Thu 2026-01-01 are in season, Fri 2026-01-02 is a weekend night.
+    quotes = client.get("/api/v1/housing/quote/", {"ids": daily.id, "check_in": "2025-12-31", "check_out": "2026-01-03"})
+    assert quotes.json()["results"][0]["total"] == "550.00"
+
+    with django_capture_on_commit_callbacks(execute=True):
+        daily.price = 80
+        daily.save()
+    quotes = client.get("/api/v1/housing/quote/", {"ids": daily.id, **dates}).json()
+    assert quotes["results"][0]["total"] == "480.00"
+
+    client.force_authenticate(guest)
+    response = client.post("/api/v1/booking/book/", {"housing_id": weekly.id, **dates, "bill": "1.00"})
+    assert response.status_code == 200
+    assert Booking.objects.get(owner=guest).bill_to_pay == Decimal("600.00")
+
+    assert client.get("/api/v1/housing/quote/", {"ids": daily.id, "check_in": "2025-12-25"}).status_code == 400
+    assert client.post("/api/v1/booking/book/", {"housing_id": 999999, **dates}).status_code == 404
+
+    # Unapproved listings are neither quoted nor bookable.
+    with django_capture_on_commit_callbacks(execute=True):
+        daily.status = False
+        daily.save()
+    assert client.get("/api/v1/housing/quote/", {"ids": daily.id, **dates}).json()["not_found"] == [daily.id]
+    assert client.post("/api/v1/booking/book/", {"housing_id": daily.id, **dates}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_host_reservations_pages_filters_and_invalidation(django_capture_on_commit_callbacks):
+    host = User.objects.create_user(username="feedhost", password="pass")
+    guest = User.objects.create_user(username="feedguest", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Flat")
+    first, second = (
+        Housing.objects.create(
+            name=name, owner=host, description="Center", address="Street", city="Almaty", country="Kazakhstan",
+            price=60, option="Per day", type=housing_type, conveniences="WiFi", status=True,
+        )
+        for name in ("Feed One", "Feed Two")
+    )
+    for index in range(7):
+        check_in = date(2025, 3, 1) + timedelta(days=index * 3)
+        Booking.objects.create(
+            owner=guest, housing=first if index % 2 else second, check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=2), status=("Finished", "Booked", "Reviewed")[index % 3],
+        )
+
+    client = APIClient()
+    client.force_authenticate(host)
+    pages, cursor = [], ""
+    while True:
+        page = client.get("/api/v1/booking/manage/", {"page_size": 3, "cursor": cursor}).json()
+        pages.append(page["results"])
+        cursor = page["next"]
+        if not cursor:
+            break
+
+    bookings = [booking for page in pages for booking in page]
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [booking["status"] for booking in bookings] == ["Booked"] * 2 + ["Finished"] * 3 + ["Reviewed"] * 2
+    assert all(a["id"] > b["id"] for a, b in zip(bookings, bookings[1:]) if a["status"] == b["status"])
+
+    filtered = client.get("/api/v1/booking/manage/", {
+        "status": "Finished", "housing": second.id, "date_from": "2025-03-02", "date_to": "2025-03-20",
+    }).json()["results"]
+    assert [(booking["housing"]["name"], booking["check_in_date"]) for booking in filtered] == [
+        ("Feed Two", "2025-03-19"), ("Feed Two", "2025-03-01"),
+    ]
+    invalid = client.get("/api/v1/booking/manage/", {"status": "Cancelled"})
+    assert invalid.status_code == 400 and list(invalid.json()) == ["status"]
+    assert client.get("/api/v1/booking/manage/", {"cursor": "broken"}).status_code == 404
+
+    # Served from the cache until a booking event drops the host's pages.
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/v1/booking/manage/", {"page_size": 3})
+    assert not queries.captured_queries
+
+    booking = Booking.objects.get(status="Booked", check_in_date=date(2025, 3, 4))
+    with django_capture_on_commit_callbacks(execute=True):
+        booking.status = "Finished"
+        booking.save(update_fields=["status"])
+    page = client.get("/api/v1/booking/manage/", {"page_size": 3}).json()["results"]
+    assert [booking["status"] for booking in page] == ["Booked", "Finished", "Finished"]
+
+
+@pytest.mark.django_db
+def test_batch_housing_detail_uses_cache_and_one_query_for_misses():
+    host = User.objects.create_user(username="batchhost", password="pass")
+    housing_type = TypeOfHousing.objects.create(name="Flat")
+    housings = [
+        Housing.objects.create(
+            name=f"Batch {index}", owner=host, description="Center", address="Street", city="Almaty",
+            country="Kazakhstan", price=50 + index, option="Per day", type=housing_type, conveniences="WiFi", status=True,
+        )
+        for index in range(4)
+    ]
+    for housing in housings:
+        for rating in (3, 4, 5, 5):
+            Review.objects.create(review_owner=host, review_text="Ok", review_rating=rating, related_to=housing)
+            housing.record_rating(rating)
+
+    client = APIClient()
+    single = client.get(f"/api/v1/housing/detail/{housings[0].id}/").json()
+    ids = ",".join(str(housing.id) for housing in reversed(housings)) + ",999999"
+
+    with CaptureQueriesContext(connection) as queries:
+        batch = client.get("/api/v1/housing/detail/batch/", {"ids": ids}).json()
+    # Listings with owners and types, their photos, their top reviews; the cached one isn't loaded again.
+    assert len(queries.captured_queries) == 3
+
+    assert [item["name"] for item in batch["results"]] == ["Batch 3", "Batch 2", "Batch 1", "Batch 0"]
+    assert batch["results"][-1] == single
+    assert all(len(item["housing_reviews"]) == 3 and item["review_amount"] == 4 for item in batch["results"])
+    assert batch["not_found"] == [999999]
+
+    # Only the unknown id is looked up again.
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/api/v1/housing/detail/batch/", {"ids": ids})
+    assert len(queries.captured_queries) == 1
+
+    too_many = ",".join(str(index) for index in range(101))
+    assert client.get("/api/v1/housing/detail/batch/", {"ids": too_many}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_review_list_keyset_pages_and_prewarm(django_capture_on_commit_callbacks):
+    host = User.objects.create_user(username="pagehost", password="pass")
+    guest = User.objects.create_user(username="pageguest", password="pass")
+    housing = Housing.objects.create(
+        name="Paged House", owner=host, description="Hills", address="Street", city="Almaty", country="Kazakhstan",
+        price=80, option="Per day", type=TypeOfHousing.objects.create(name="House"), conveniences="WiFi", status=True,
+        review_count=5,
+    )
+    for index in range(5):
+        review = Review.objects.create(review_owner=host, review_text=f"Review {index}", review_rating=4, related_to=housing)
+        # Two reviews share each date, so ties are broken by id.
+        Review.objects.filter(pk=review.pk).update(review_date=date(2025, 1, 1) + timedelta(days=index // 2))
+
+    client = APIClient()
+    first = client.get("/api/v1/review/list/", {"housing_id": housing.id, "page_size": 2}).json()
+    second = client.get("/api/v1/review/list/", {"housing_id": housing.id, "page_size": 2, "cursor": first["next"]}).json()
+    last = client.get("/api/v1/review/list/", {"housing_id": housing.id, "page_size": 2, "cursor": second["next"]}).json()
+
+    texts = [review["review_text"] for page in (first, second, last) for review in page["results"]]
+    assert texts == ["Review 4", "Review 3", "Review 2", "Review 1", "Review 0"]
+    assert first["count"] == 5 and last["next"] is None
+    assert client.get("/api/v1/review/list/", {"housing_id": housing.id, "cursor": "bogus"}).status_code == 404
+
+    Booking.objects.create(
+        owner=guest, housing=housing, check_in_date=date(2025, 2, 1), check_out_date=date(2025, 2, 3), status="Finished",
+    )
+    client.force_authenticate(guest)
+    with django_capture_on_commit_callbacks(execute=True):
+        client.post("/api/v1/review/add/", {"housing_id": housing.id, "rating": 5, "text": "Newest"})
+
+    with CaptureQueriesContext(connection) as queries:
+        prewarmed = client.get("/api/v1/review/list/", {"housing_id": housing.id}).json()
+    assert len(queries.captured_queries) == 0
+    assert prewarmed["count"] == 6 and prewarmed["results"][0]["review_text"] == "Newest"
@@ -3,16 +3,21 @@ from .views import (RetrieveAllHousingView, FavoritesView,
                     WriteReviewView, HousingDetailView, MyHousingReservationsView,
                     RetrieveReviewView, AddHousingView, UserHousingsView,
                     HousingBookView, UserBookingsView, RemoveBookingView,
-                    ConfirmCheckingOutView
+                    ConfirmCheckingOutView, HousingFacetsView, HousingBatchDetailView,
+                    HousingCalendarView, HousingQuoteView,
                     )
 
 urlpatterns = [
     path("housing/list/", RetrieveAllHousingView.as_view()),
+    path("housing/facets/", HousingFacetsView.as_view()),
     path("favorites/", FavoritesView.as_view()),
     path("review/add/", WriteReviewView.as_view()),
     path("review/list/", RetrieveReviewView.as_view()),
     path("housing/add/", AddHousingView .as_view()),
     path("housing/detail/<int:pk>/", HousingDetailView.as_view()),
+    path("housing/detail/batch/", HousingBatchDetailView.as_view()),
+    path("housing/quote/", HousingQuoteView.as_view()),
+    path("housing/calendar/<int:pk>/", HousingCalendarView.as_view()),
     path("housing/user/<str:username>/", UserHousingsView.as_view()),
     path("booking/book/", HousingBookView.as_view()),
     path("booking/list/", UserBookingsView.as_view()),
@@ -1,55 +1,126 @@
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
-from django.db.models import OuterRef, Subquery, Exists, Count, Prefetch, When, Value, Case, IntegerField
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.utils import translate_validation
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import generics, filters, status
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from .filters import HousingFilter
+from .cache import (
+    housing_list_cache_key, review_page_cache_key, reservations_page_cache_key, query_digest, until_midnight,
+    get_favorite_housing_ids, is_listing_host, set_tagged, housing_tag, user_tag, reservations_tag,
+    HOUSING_LIST_TIMEOUT, HOUSING_DETAIL_TIMEOUT, TAGGED_TIMEOUT, BOOKINGS_TIMEOUT,
+)
+from .conditional import (
+    cache_payload, cache_payloads, conditional_response, read_through, selection_variant,
+)
+from .facets import read_facets, count_facets, NON_FILTER_PARAMS
+from .filters import HousingFilter, ReservationFilter
+from .flat import FlatSerializer
+from .models import BOOKING_OVERLAP_CONSTRAINT
+from .occupancy import (
+    EPOCH, MAX_CALENDAR_MONTHS, load_occupancy, month_range, patch_occupancy_on_commit, read_calendar,
+)
+from .pagination import HousingPagination, HousingCursorPagination, ReviewPagination, ReservationPagination
+from .pricing import get_price_tables, night_factors, quote, quote_total
 from .tasks import book_notification_email, email_finished_notification
 from .serializer import *
 from account.permissions import IsNotBanned
 
 
-class HousingPagination(PageNumberPagination):
-    page_size = 30
-    page_size_query_param = 'page_size'
-
-
 class RetrieveAllHousingView(generics.ListAPIView):
     permission_classes = [AllowAny]
-    pagination_class = HousingPagination
+    pagination_class = HousingCursorPagination
+    page_pagination_class = HousingPagination
+    page_mode_params = ("page", "ordering", "near", "bbox")
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     queryset = Housing.objects.all()
     serializer_class = HousingSerializer
     filterset_class = HousingFilter
 
     def get_queryset(self):
-        user = self.request.user
-        wallpaper_photo = HousingPhotos.objects.filter(
-            housing=OuterRef('pk'),
-            is_wallpaper=True,
-        ).values("photo")[:1]
-
-        basic_queryset = Housing.objects.all().select_related("owner").annotate(
-            wallpaper=Subquery(wallpaper_photo)
-        ).order_by("-created_at").exclude(status=False)
-
-        if user.is_authenticated:
-            is_favorite = Favorites.objects.filter(
-                favorites_owner=user,
-                favorites_housing=OuterRef('pk'),
-            )
-            return basic_queryset.annotate(
-                is_favorite=Exists(is_favorite)
-            ).exclude(owner=user)
+        # Columns are picked by FlatSerializer.values() from the selected fields.
+        return Housing.objects.order_by("-created_at", "-id").filter(status=True)
+
+    def get_serializer(self, *args, **kwargs):
+        return super().get_serializer(*args, **get_sparse_fields(self.request), **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        # Pages are shared by everyone but hosts; the key embeds the catalog generation, so writes never scan keys.
+        cache_key = housing_list_cache_key(request.query_params)
+        host = request.user if request.user.is_authenticated and is_listing_host(request.user) else None
+        if host is not None:
+            # Hosts don't see their own listings, which has to happen before pagination to keep pages full.
+            cache_key = f"{cache_key}_host_{host.id}"
+        data = cache.get(cache_key)
+
+        if data is None:
+            data = self.list_rows(exclude_owner=host)
+            cache.set(cache_key, data, HOUSING_LIST_TIMEOUT)
+
+        if request.user.is_authenticated:
+            data = self.apply_user_overlay(data, request.user)
+
+        return Response(data, status=status.HTTP_200_OK)
+
+    def list_rows(self, exclude_owner=None):
+        # ListAPIView.list, but the page is read as .values() rows and serialized without model instances.
+        queryset = self.filter_queryset(self.get_queryset())
+        if exclude_owner is not None:
+            queryset = queryset.exclude(owner=exclude_owner)
+        flat = FlatSerializer(self.get_serializer(), queryset)
+        # created_at is read by the cursor paginator even when the payload doesn't include it.
+        page = self.paginate_queryset(flat.values("created_at"))
+
+        return self.get_paginated_response(flat.serialize(page)).data
+
+    def apply_user_overlay(self, data, user):
+        favorite_ids = get_favorite_housing_ids(user)
+
+        results = [{**housing, "is_favorite": housing["id"] in favorite_ids} for housing in data["results"]]
+
+        return {**data, "results": results}
+
+    @property
+    def paginator(self):
+        # Old clients still send ?page=N, new ones can opt in with ?pagination=page.
+        # Custom orderings (relevance, distance) can't be expressed as a cursor.
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request is not None else {}
+            if params.get("pagination") == "page" or any(param in params for param in self.page_mode_params):
+                self._paginator = self.page_pagination_class()
+            else:
+                self._paginator = self.pagination_class()
+
+        return self._paginator
+
+
+class HousingFacetsView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = {
+            key: value for key, value in request.query_params.items()
+            if value and key not in NON_FILTER_PARAMS
+        }
+
+        facets = read_facets(params)
+
+        if facets is None:
+            filterset = HousingFilter(request.query_params, queryset=Housing.objects.filter(status=True))
 
-        return basic_queryset
+            if not filterset.is_valid():
+                # Raised like DjangoFilterBackend does, so the 400 body matches the listing's.
+                raise translate_validation(filterset.errors)
+
+            facets = count_facets(filterset.qs)
+
+        return Response(facets, status=status.HTTP_200_OK)
 
 
 class FavoritesView(APIView):
@@ -76,8 +147,6 @@ class FavoritesView(APIView):
 
             Favorites.objects.create(favorites_housing=housing_obj, favorites_owner=user)
 
-            cache.delete(f'favorites_{user.username}')
-
             return Response(
                 {
                     "message": "Favorites added.",
@@ -88,7 +157,6 @@ class FavoritesView(APIView):
 
     def delete(self, request):
         user = request.user
-        cache_key = f"favorites_{user.username}"
 
         housing_id = request.query_params.get('housing_id', None)
 
@@ -109,7 +177,6 @@ class FavoritesView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         favorite.delete()
-        cache.delete(cache_key)
 
         return Response({
             "message": "Favorites deleted.",
@@ -124,20 +191,17 @@ class FavoritesView(APIView):
         if data:
             return Response(data=data, status=status.HTTP_200_OK)
 
-        wallpapers = HousingPhotos.objects.filter(is_wallpaper=True)
-
-        favorites = ((Favorites.objects.filter(favorites_owner=user).
-                     select_related("favorites_housing", "favorites_housing__type")).
-                     prefetch_related(Prefetch("favorites_housing__photos", queryset=wallpapers, to_attr="wallpaper_photo")))
+        favorites = Favorites.objects.filter(favorites_owner=user)
 
         if not favorites.exists():
             return Response({
                 "message": "You don't have any favorites.",
             }, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = FavoritesListSerializer(favorites, many=True).data
+        serializer = FlatSerializer(FavoritesListSerializer(), favorites).serialize()
 
-        cache.set(cache_key, serializer, 600)
+        tags = [user_tag(user.id), *(housing_tag(favorite["housing"]["id"]) for favorite in serializer)]
+        set_tagged(cache_key, serializer, TAGGED_TIMEOUT, tags)
 
         return Response(serializer, status=status.HTTP_200_OK)
 
@@ -172,22 +236,20 @@ class WriteReviewView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        Review.objects.create(
-            related_to=housing_obj,
-            review_owner=user,
-            review_text=text,
-            review_rating=rating
-        )
+        with transaction.atomic():
+            Review.objects.create(
+                related_to=housing_obj,
+                review_owner=user,
+                review_text=text,
+                review_rating=rating
+            )
+            housing_obj.record_rating(rating)
 
-        housing_obj.rated_people = (housing_obj.rated_people or 0) + 1
-        housing_obj.rating_amount = (housing_obj.rating_amount or 0) + rating
-        housing_obj.save(update_fields=["rating_amount", "rated_people"])
+            booking.status = "Reviewed"
+            booking.save(update_fields=["status"])
 
-        booking.status = "Reviewed"
-        booking.save(update_fields=["status"])
-
-        cache.delete(f"review_{housing_id}")
-        cache.delete(f"user_bookings_{user.username}")
+        # Registered after the saves' invalidations, so the fresh first page isn't dropped right after it's built.
+        transaction.on_commit(lambda: RetrieveReviewView.cache_page(housing_id))
 
         return Response(
             {"message": "Review successfully added."},
@@ -195,15 +257,9 @@ class WriteReviewView(APIView):
         )
 
 
-class ReviewPagination(PageNumberPagination):
-    page_size = 50
-    page_size_query_param = 'page_size'
-    page_query_param = 'page'
-    max_page_size = 100
-
-
 class RetrieveReviewView(APIView):
     permission_classes = [AllowAny]
+    pagination_class = ReviewPagination
 
     @swagger_auto_schema(
         manual_parameters=[
@@ -215,12 +271,19 @@ class RetrieveReviewView(APIView):
                 type=openapi.TYPE_INTEGER,
             ),
             openapi.Parameter(
-                name="page",
+                name="cursor",
                 in_=openapi.IN_QUERY,
-                description="Page number, pagination",
-                required=True,
+                description="`next` of the previous page; omit for the newest reviews.",
+                required=False,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name="page_size",
+                in_=openapi.IN_QUERY,
+                description="Reviews per page, at most 100.",
+                required=False,
                 type=openapi.TYPE_INTEGER,
-            )
+            ),
         ],
         responses={200: openapi.Response("Successful Response", ReviewRetrieveSerializer(many=True))}
     )
@@ -242,24 +305,40 @@ class RetrieveReviewView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST
             )
 
-        cache_key = f"review_{housing_id}"
-        cached_data = cache.get(cache_key)
-
-        if cached_data:
-            return Response(data=cached_data, status=status.HTTP_200_OK)
+        paginator = self.pagination_class()
+        cursor = request.query_params.get(paginator.cursor_query_param, "")
+        page_size = paginator.get_page_size(request)
+        entry = cache.get(review_page_cache_key(housing_id, cursor, page_size))
 
-        reviews = Review.objects.filter(related_to_id=housing_id).select_related("review_owner").order_by("-review_date")
+        if entry is None:
+            entry = self.cache_page(housing_id, cursor, page_size)
 
-        if not reviews.exists():
+        if entry is None:
             return Response({
                 "message": "No reviews found.",
             }, status=status.HTTP_404_NOT_FOUND)
 
-        serializer = ReviewRetrieveSerializer(reviews, many=True).data
+        return conditional_response(request, entry)
 
-        cache.set(cache_key, serializer, timeout=600)
+    @classmethod
+    def cache_page(cls, housing_id, cursor="", page_size=None):
+        paginator = cls.pagination_class()
+        page_size = page_size or paginator.page_size
 
-        return Response(serializer, status=status.HTTP_200_OK)
+        reviews = Review.objects.filter(related_to_id=housing_id).select_related("review_owner", "related_to")
+        reviews, next_cursor = paginator.paginate_queryset(reviews, cursor, page_size)
+
+        if not reviews and not cursor:
+            return None
+
+        data = {
+            "count": Housing.objects.filter(pk=housing_id).values_list("review_count", flat=True).first() or 0,
+            "next": next_cursor,
+            "results": ReviewRetrieveSerializer(reviews, many=True).data,
+        }
+        tags = [housing_tag(housing_id), *(user_tag(review.review_owner_id) for review in reviews)]
+
+        return cache_payload(review_page_cache_key(housing_id, cursor, page_size), data, TAGGED_TIMEOUT, tags)
 
 
 class AddHousingView(APIView):
@@ -271,7 +350,6 @@ class AddHousingView(APIView):
     def post(self, request):
         user = request.user
         serializer = AddHousingSerializer(data=request.data, context={"request": request})
-        cache_key = f"housings_{user.username}"
 
         if serializer.is_valid():
             housing = serializer.save(owner=request.user)
@@ -282,9 +360,6 @@ class AddHousingView(APIView):
                 }, status=status.HTTP_201_CREATED
             )
 
-        if cache.get(cache_key):
-            cache.delete(cache_key)
-
         return Response(
             serializer.errors, status=status.HTTP_400_BAD_REQUEST
         )
@@ -294,18 +369,148 @@ class HousingDetailView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, pk):
-        reviews = Prefetch("reviews", queryset=Review.objects.order_by("-review_date")[:3], to_attr="housing_reviews")
-        housing = get_object_or_404(Housing.objects.prefetch_related('photos', reviews).select_related("owner").annotate(review_amount=Count("reviews")), pk=pk)
-        cache_key = f"housing_{housing.id}"
+        selection = get_sparse_fields(request)
+        # Only the full payload is cached; a `?fields=` request trims it, so every selection shares one rebuild.
+        entry = read_through(f"housing_{pk}", lambda: self.build_payload(pk), HOUSING_DETAIL_TIMEOUT)
+        data = apply_sparse_fields(entry["data"], required=HousingDetailsSerializer.required_fields, **selection)
 
-        if cache.get(cache_key):
-            return Response(data=cache.get(cache_key), status=status.HTTP_200_OK)
+        return conditional_response(request, entry, data, selection_variant(selection))
+
+    def build_payload(self, pk):
+        housing = get_object_or_404(self.get_queryset(HousingDetailsSerializer().fields), pk=pk)
+
+        return HousingDetailsSerializer(housing).data, self.get_tags(housing)
+
+    @staticmethod
+    def get_tags(housing):
+        return [housing_tag(housing.id), user_tag(housing.owner_id)]
+
+    @staticmethod
+    def get_queryset(fields):
+        queryset = Housing.objects.select_related("owner", "type")
+
+        if "photos" in fields:
+            queryset = queryset.prefetch_related("photos")
+        if "housing_reviews" in fields:
+            # The slice becomes a per-listing window, so this also works when many listings are loaded at once.
+            reviews = Prefetch(
+                "reviews", queryset=Review.objects.select_related("review_owner").order_by("-review_date")[:3],
+                to_attr="housing_reviews",
+            )
+            queryset = queryset.prefetch_related(reviews)
+
+        return queryset
+
+
+def parse_ids(value) -> list:
+    """Distinct ids from a comma-separated query param, in request order."""
+    return list(dict.fromkeys(int(part) for part in value.split(",") if part.strip()))
+
+
+class HousingBatchDetailView(APIView):
+    permission_classes = [AllowAny]
+    max_ids = 100
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                name="ids",
+                in_=openapi.IN_QUERY,
+                description="Comma-separated housing ids, at most 100.",
+                required=True,
+                type=openapi.TYPE_STRING,
+            ),
+        ],
+        responses={200: openapi.Response("Successful Response", HousingDetailsSerializer(many=True))}
+    )
+    def get(self, request):
+        try:
+            ids = parse_ids(request.query_params.get("ids", ""))
+        except ValueError:
+            return Response({"message": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not ids:
+            return Response({"message": "Housing ids not provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        serializer = HousingDetailsSerializer(housing)
+        if len(ids) > self.max_ids:
+            return Response(
+                {"message": f"At most {self.max_ids} housings per request."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache_keys = {housing_id: f"housing_{housing_id}" for housing_id in ids}
+        entries = cache.get_many(cache_keys.values())
+        missing = [housing_id for housing_id, cache_key in cache_keys.items() if cache_key not in entries]
+
+        if missing:
+            housings = HousingDetailView.get_queryset(HousingDetailsSerializer().fields).filter(pk__in=missing)
+            entries.update(cache_payloads({
+                cache_keys[housing.id]: (HousingDetailsSerializer(housing).data, HousingDetailView.get_tags(housing))
+                for housing in housings
+            }, HOUSING_DETAIL_TIMEOUT))
+
+        selection = get_sparse_fields(request)
+        required = HousingDetailsSerializer.required_fields
+        results = [
+            apply_sparse_fields(entries[cache_keys[housing_id]]["data"], required=required, **selection)
+            for housing_id in ids if cache_keys[housing_id] in entries
+        ]
+        not_found = [housing_id for housing_id in ids if cache_keys[housing_id] not in entries]
 
-        cache.set(cache_key, serializer.data, 600)
+        return Response({"results": results, "not_found": not_found}, status=status.HTTP_200_OK)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+class HousingQuoteView(APIView):
+    permission_classes = [AllowAny]
+    max_ids = 100
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                name="ids",
+                in_=openapi.IN_QUERY,
+                description="Comma-separated housing ids, at most 100.",
+                required=True,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(name="check_in", in_=openapi.IN_QUERY, required=True, type=openapi.TYPE_STRING),
+            openapi.Parameter(name="check_out", in_=openapi.IN_QUERY, required=True, type=openapi.TYPE_STRING),
+        ],
+    )
+    def get(self, request):
+        serializer = StayDatesSerializer(data=request.query_params)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            ids = parse_ids(request.query_params.get("ids", ""))
+        except ValueError:
+            return Response({"message": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not ids:
+            return Response({"message": "Housing ids not provided."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(ids) > self.max_ids:
+            return Response(
+                {"message": f"At most {self.max_ids} housings per request."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        check_in = serializer.validated_data["check_in"]
+        check_out = serializer.validated_data["check_out"]
+        tables = get_price_tables(ids)
+        # The dates are the same for every listing, so the nightly multipliers are computed once.
+        factors = night_factors(check_in, check_out)
+
+        return Response({
+            "check_in": check_in,
+            "check_out": check_out,
+            "nights": len(factors),
+            "results": [
+                {"housing_id": housing_id, **quote(tables[housing_id], factors)}
+                for housing_id in ids if housing_id in tables
+            ],
+            "not_found": [housing_id for housing_id in ids if housing_id not in tables],
+        }, status=status.HTTP_200_OK)
 
 
 class UserHousingsView(APIView):
@@ -314,19 +519,19 @@ class UserHousingsView(APIView):
     def get(self, request, username):
         user = get_object_or_404(get_user_model(), username=username)
         cache_key = f"housings_{username}"
+        selection = get_sparse_fields(request)
 
         if cache.get(cache_key):
-            return Response(cache.get(cache_key), status=status.HTTP_200_OK)
+            data = apply_sparse_fields(cache.get(cache_key), required=UserHousingsSerializer.required_fields, **selection)
+            return Response(data, status=status.HTTP_200_OK)
 
-        wallpaper = HousingPhotos.objects.filter(is_wallpaper=True)
-        my_housings = (Housing.objects.
-                       filter(owner=user).
-                       select_related("type").
-                       prefetch_related(Prefetch("photos", queryset=wallpaper, to_attr="wallpaper_photo")))
+        fields = UserHousingsSerializer(**selection).get_only_fields()
+        my_housings = trim_queryset(Housing.objects.filter(owner=user), fields)
 
-        serializer = UserHousingsSerializer(my_housings, many=True).data
+        serializer = UserHousingsSerializer(my_housings, many=True, **selection).data
 
-        cache.set(cache_key, serializer, 600)
+        if not selection:
+            set_tagged(cache_key, serializer, TAGGED_TIMEOUT, [user_tag(user.id)])
 
         return Response(serializer, status=status.HTTP_200_OK)
 
@@ -345,26 +550,30 @@ class HousingBookView(APIView):
         housing_id = serializer.validated_data["housing_id"]
         check_in = serializer.validated_data["check_in"]
         check_out = serializer.validated_data["check_out"]
-        bill = serializer.validated_data["bill"]
 
-        overlapping = Booking.objects.filter(owner=user, housing_id=housing_id, check_in_date__lt=check_out, check_out_date__gt=check_in).exists()
+        tables = get_price_tables([housing_id])
+        if housing_id not in tables:
+            return Response({"message": "Housing does not exist."}, status=status.HTTP_404_NOT_FOUND)
+        bill = quote_total(tables[housing_id], night_factors(check_in, check_out))
 
-        if overlapping:
+        # No check-then-insert: the exclusion constraint rejects an overlapping stay in the INSERT itself,
+        # so two guests racing for the same dates can't both get through.
+        try:
+            with transaction.atomic():
+                booking = Booking.objects.create(owner=user, housing_id=housing_id, check_in_date=check_in, check_out_date=check_out, bill_to_pay=bill)
+        except IntegrityError as exc:
+            if getattr(exc.__cause__, "diag", None) is None or exc.__cause__.diag.constraint_name not in (BOOKING_OVERLAP_CONSTRAINT, "unique_booking"):
+                raise
             return Response(
                 {
                     "message": "Housing booking already taken.",
                 }, status=status.HTTP_400_BAD_REQUEST
             )
 
-        booking = Booking.objects.create(owner=user, housing_id=housing_id, check_in_date=check_in, check_out_date=check_out, bill_to_pay=bill)
-
-        cache_key = f"user_bookings_{user.username}"
+        patch_occupancy_on_commit(booking, occupied=True)
 
         book_notification_email.delay(user_id=user.id, booking_id=booking.id)
 
-        if cache.get(cache_key):
-            cache.delete(cache_key)
-
         return Response({
             "message": "Housing booking successful.",
         }, status=status.HTTP_200_OK)
@@ -377,18 +586,19 @@ class UserBookingsView(APIView):
         user = request.user
 
         cache_key = f"user_bookings_{user.username}"
+        selection = get_sparse_fields(request)
 
         if cache.get(cache_key):
-            return Response(cache.get(cache_key), status=status.HTTP_200_OK)
+            data = apply_sparse_fields(cache.get(cache_key), required=UserBookingSerializer.required_fields, **selection)
+            return Response(data, status=status.HTTP_200_OK)
 
-        bookings = (Booking.objects.filter(owner=user).exclude(status="reviewed")
-                    .select_related("housing")
-                    .prefetch_related(
-                    Prefetch("housing__photos", queryset=HousingPhotos.objects.filter(is_wallpaper=True), to_attr="wallpaper"))
-                    )
+        bookings = Booking.objects.filter(owner=user).exclude(status="reviewed")
 
-        serializer = UserBookingSerializer(bookings, many=True).data
-        cache.set(cache_key, serializer, 600)
+        serializer = FlatSerializer(UserBookingSerializer(**selection), bookings).serialize()
+
+        if not selection:
+            tags = [user_tag(user.id), *(housing_tag(booking["housing"]["id"]) for booking in serializer)]
+            set_tagged(cache_key, serializer, BOOKINGS_TIMEOUT, tags)
 
         return Response(serializer, status=status.HTTP_200_OK)
 
@@ -398,7 +608,6 @@ class RemoveBookingView(APIView):
 
     def delete(self, request, pk):
         user = request.user
-        cache_key = f"user_bookings_{user.username}"
 
         try:
             booking = Booking.objects.get(id=pk, owner=user)
@@ -408,36 +617,135 @@ class RemoveBookingView(APIView):
             }, status=status.HTTP_404_NOT_FOUND)
 
         booking.delete()
-        cache.delete(cache_key)
+        patch_occupancy_on_commit(booking, occupied=False)
 
         return Response({"message": "Booking removed."}, status=status.HTTP_200_OK)
 
 
+class HousingCalendarView(APIView):
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                name="start",
+                in_=openapi.IN_QUERY,
+                description="First month, YYYY-MM. Defaults to the current month.",
+                required=False,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name="months",
+                in_=openapi.IN_QUERY,
+                description=f"Number of months, 1 to {MAX_CALENDAR_MONTHS}.",
+                required=False,
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+    )
+    def get(self, request, pk):
+        try:
+            start = date.fromisoformat(f"{request.query_params.get('start', date.today().strftime('%Y-%m'))}-01")
+            months = int(request.query_params.get("months", 1))
+            # The range has to end within the dates Python can represent.
+            month_range(start, months)
+        except ValueError:
+            return Response({"message": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if start < EPOCH or not 1 <= months <= MAX_CALENDAR_MONTHS:
+            return Response({"message": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
+
+        calendar = read_calendar(pk, start, months)
+        if calendar is None:
+            get_object_or_404(Housing, pk=pk)
+            calendar = read_calendar(pk, start, months, load_occupancy(pk))
+
+        return Response({"housing_id": pk, "months": calendar}, status=status.HTTP_200_OK)
+
+
 class MyHousingReservationsView(APIView):
     permission_classes = [IsAuthenticated, IsNotBanned]
+    pagination_class = ReservationPagination
 
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                name="status",
+                in_=openapi.IN_QUERY,
+                description="Only bookings with this status: Booked, Finished or Reviewed.",
+                required=False,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name="housing",
+                in_=openapi.IN_QUERY,
+                description="Only bookings of this housing.",
+                required=False,
+                type=openapi.TYPE_INTEGER,
+            ),
+            openapi.Parameter(
+                name="date_from",
+                in_=openapi.IN_QUERY,
+                description="Only stays ending after this date.",
+                required=False,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name="date_to",
+                in_=openapi.IN_QUERY,
+                description="Only stays starting before this date.",
+                required=False,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name="cursor",
+                in_=openapi.IN_QUERY,
+                description="`next` of the previous page; omit for the first one.",
+                required=False,
+                type=openapi.TYPE_STRING,
+            ),
+            openapi.Parameter(
+                name="page_size",
+                in_=openapi.IN_QUERY,
+                description="Bookings per page, at most 100.",
+                required=False,
+                type=openapi.TYPE_INTEGER,
+            ),
+        ],
+        responses={200: openapi.Response("Successful Response", MyHousingReservationSerializer(many=True))}
+    )
     def get(self, request):
         user = request.user
-        cache_key = f"my_housing_reservations_{user.username}"
+        filterset = ReservationFilter(request.query_params, queryset=self.get_queryset(user))
 
-        if cache.get(cache_key):
-            return Response(cache.get(cache_key), status=status.HTTP_200_OK)
+        if not filterset.is_valid():
+            raise translate_validation(filterset.errors)
+
+        paginator = self.pagination_class()
+        cursor = request.query_params.get(paginator.cursor_query_param, "")
+        page_size = paginator.get_page_size(request)
+        filters_digest = query_digest(request.query_params, ReservationFilter.base_filters)
+        cache_key = reservations_page_cache_key(user.username, filters_digest, cursor, page_size)
+        entry = cache.get(cache_key)
 
-        bookings = (Booking.objects.filter(housing__owner=user).
-                    select_related("owner", "housing").
-                    annotate(status_order=Case(
-                When(status="Booked", then=Value(1)),
-                        When(status="Finished", then=Value(2)),
-                        When(status="Reviewed", then=Value(3)),
-                        output_field=IntegerField()
-                    )).
-                    order_by("-created_at"))
+        if entry is None:
+            flat = FlatSerializer(MyHousingReservationSerializer(), filterset.qs)
+            # owner_id is only needed for the tags below.
+            rows = flat.values("status", "created_at", "owner_id")
+            bookings, next_cursor = paginator.paginate_queryset(rows, cursor, page_size)
+            data = {"next": next_cursor, "results": flat.serialize(bookings)}
 
-        serializer = MyHousingReservationSerializer(bookings, many=True)
+            # Any booking, listing or profile change of the host or of these guests drops the page; the
+            # midnight cut-off is for date_status, which is computed against today.
+            guests = {booking["owner_id"] for booking in bookings}
+            tags = [user_tag(user.id), reservations_tag(user.id), *map(user_tag, guests)]
+            entry = cache_payload(cache_key, data, until_midnight(TAGGED_TIMEOUT), tags)
 
-        cache.set(cache_key, serializer.data, 30)
+        return conditional_response(request, entry)
 
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    @staticmethod
+    def get_queryset(user):
+        return Booking.objects.filter(housing__owner=user)
 
 
 class ConfirmCheckingOutView(APIView):
@@ -445,7 +753,6 @@ class ConfirmCheckingOutView(APIView):
 
     def patch(self, request, pk):
         user = request.user
-        cache_key = f"my_housing_reservations_{user.username}"
 
         booking = get_object_or_404(Booking, id=pk, housing__owner=user)
 
@@ -455,12 +762,9 @@ class ConfirmCheckingOutView(APIView):
                 "message": "Guests are not checking out yet.",
             }, status=status.HTTP_400_BAD_REQUEST)
 
+        # The stay's nights remain taken, so the occupancy bitmap needs no patch here.
         booking.status = "Finished"
-        booking.save()
+        booking.save(update_fields=["status"])
         email_finished_notification.delay(user_id=booking.owner.id, booking_id=booking.id)
 
-        if cache.get(cache_key):
-            cache.delete(cache_key)
-            cache.delete(f"user_bookings_{booking.owner.username}")
-
         return Response({"message": "Checking out successful."}, status=status.HTTP_200_OK)